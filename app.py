@@ -2,22 +2,35 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import os
-from io import StringIO
-import docx2txt
-import fitz
 import tempfile
+import time
+from datetime import datetime, time as dt_time, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from utils.api_client import batch_analyze_sentiment_with_keywords
+from utils.api_client import API_URL, batch_analyze_sentiment_with_keywords
+from utils.rate_controller import get_rate_controller
+from utils.sharding import sharded_batch_analyze
+from utils.async_client import DEFAULT_CONCURRENCY, run_batch_analyze_async
+from utils.multilingual import batch_analyze_multilingual
+from utils.result_store import ResultStore
+from utils.lexicon_scorer import DEFAULT_ESCALATION_THRESHOLD, calibration_report
 from utils.text_processing import explain_sentiment
+from utils.file_processing import extract_lines_from_files
+from utils.aggregation import SENTIMENT_LABELS, SentimentAggregator
 from components.data_visualization import (
-    compute_sentiment_distribution,
+    build_distribution_bar,
+    build_sentiment_line_chart,
+    compute_sentiment_by_document,
+    plot_sentiment_by_document,
     plot_sentiment_distribution_bar,
     plot_sentiment_distribution_pie,
     plot_sentiment_line_chart,
-    results_to_dataframe
+    result_to_row,
+    results_to_dataframe,
+    update_distribution_bar,
+    update_sentiment_trend
 )
 from export.export_csv import create_csv_download_link
 from export.export_json import export_to_json
@@ -111,6 +124,7 @@ with st.sidebar:
     - `.txt` - Plain text files
     - `.pdf` - PDF documents  
     - `.docx` - Word documents
+    - `.zip` - Archives of the above (multiple files can be uploaded at once)
 
     **API:** Powered by HuggingFace's RoBERTa model
     """)
@@ -133,10 +147,304 @@ if not os.getenv('HUGGINGFACE_API_KEY'):
     st.error("🔑 HuggingFace API key not found! Please set HUGGINGFACE_API_KEY in your .env file.")
     st.stop()
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def extract_uploaded_files(files):
+    """
+    Extract lines from uploaded (name, bytes) files once; reruns caused by
+    widget changes reuse the result instead of starting a new process pool.
+    """
+    return extract_lines_from_files(list(files))
+
+@st.cache_resource
+def get_result_store():
+    """One result store per server process, shared by all sessions"""
+    return ResultStore()
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def summarize_history(filters, version):
+    """Label counts for a History search; version keys the cache on the newest stored row"""
+    return get_result_store().summarize(**filters)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def search_history(filters, version, limit=1000):
+    """Most recent stored results for a History search, cached like summarize_history"""
+    return get_result_store().search(limit=limit, **filters)
+
+# --- Analysis Settings ---
+KEYWORD_METHOD_LABELS = {
+    "yake": "YAKE (per text)",
+    "tfidf": "TF-IDF (fast, whole batch)"
+}
+
+EXECUTION_MODE_LABELS = {
+    "sequential": "Sequential",
+    "async": "Concurrent requests (async)",
+    "processes": "Worker processes",
+    "multilingual": "Route by language"
+}
+
+def render_analysis_settings(texts, key_prefix):
+    """
+    Show the analysis options together with the adaptive request rate and a
+    time estimate from measured throughput. Returns the chosen settings as a dict.
+    """
+    controller = get_rate_controller(API_URL)
+    st.markdown("### ⚙️ Analysis Settings")
+    keyword_method = st.radio(
+        "Keyword extraction",
+        list(KEYWORD_METHOD_LABELS),
+        format_func=KEYWORD_METHOD_LABELS.get,
+        horizontal=True,
+        key=f"{key_prefix}_keyword_method"
+    )
+    execution = st.radio(
+        "Execution",
+        list(EXECUTION_MODE_LABELS),
+        format_func=EXECUTION_MODE_LABELS.get,
+        horizontal=True,
+        key=f"{key_prefix}_execution"
+    )
+    parallelism = 1
+    max_rate = None
+    if execution == "async":
+        parallelism = st.number_input("Requests in flight", 1, 1000, DEFAULT_CONCURRENCY, key=f"{key_prefix}_concurrency")
+    elif execution == "processes":
+        parallelism = st.number_input("Worker processes", 1, os.cpu_count() or 1, os.cpu_count() or 1, key=f"{key_prefix}_workers")
+        max_rate = st.number_input(
+            "Max requests/second for this endpoint", 1.0, 1000.0, float(controller.max_rate), 1.0,
+            help="All workers share this ceiling; raise it if the endpoint can take more",
+            key=f"{key_prefix}_max_rate"
+        )
+    elif execution == "multilingual":
+        st.caption("🌍 Each language is scored concurrently on its own model with its own keyword extractor")
+    escalation_threshold = None
+    if st.checkbox("Tiered scoring (lexicon first, model only for unclear lines)", key=f"{key_prefix}_tiered"):
+        escalation_threshold = st.slider(
+            "Lexicon confidence needed to skip the model",
+            0.6, 0.99, DEFAULT_ESCALATION_THRESHOLD, 0.01,
+            key=f"{key_prefix}_escalation_threshold"
+        )
+    st.caption(f"🚦 Request rate adapts automatically (currently {controller.rate:.1f} requests/second)")
+    st.info(f"⏱️ Estimated analysis time: {controller.estimate_seconds(len(texts)):.1f} seconds")
+    return {
+        "keyword_method": keyword_method,
+        "execution": execution,
+        "parallelism": parallelism,
+        "max_rate": max_rate,
+        "escalation_threshold": escalation_threshold
+    }
+
+# --- Results Section ---
+# Minimum time between live chart redraws during an analysis
+LIVE_REDRAW_SECONDS = 0.75
+
+def render_metrics(total, percentages):
+    """Render the total and per-sentiment percentage cards"""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>Total</h3><h2>{total}</h2>
+        </div>""", unsafe_allow_html=True)
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>😊 Positive</h3><h2>{percentages.get('positive', 0):.1f}%</h2>
+        </div>""", unsafe_allow_html=True)
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>😐 Neutral</h3><h2>{percentages.get('neutral', 0):.1f}%</h2>
+        </div>""", unsafe_allow_html=True)
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>😞 Negative</h3><h2>{percentages.get('negative', 0):.1f}%</h2>
+        </div>""", unsafe_allow_html=True)
+
+def run_analysis(texts, settings, metadata=None):
+    """
+    Run the batch analysis, updating progress, live metrics and live charts as
+    results arrive. Live charts are patched with new data instead of rebuilt.
+    """
+    aggregator = SentimentAggregator()
+    live_metrics = st.empty()
+    live_charts = st.empty()
+    live_bar = build_distribution_bar(aggregator.counts)
+    live_trend = build_sentiment_line_chart()
+    trend_labels = []
+    redraws = 0
+    last_redraw = 0.0
+
+    def on_result(result):
+        nonlocal redraws, last_redraw
+        aggregator.add(result)
+        trend_labels.append(result_to_row(result)["sentiment"])
+        # Redraw at most every LIVE_REDRAW_SECONDS so large batches don't flood the browser
+        now = time.monotonic()
+        if now - last_redraw >= LIVE_REDRAW_SECONDS or len(trend_labels) == len(texts):
+            last_redraw = now
+            update_distribution_bar(live_bar, aggregator.counts)
+            update_sentiment_trend(live_trend, trend_labels)
+            redraws += 1
+            with live_metrics.container():
+                render_metrics(aggregator.total, aggregator.distribution()[1])
+            with live_charts.container():
+                bar_col, trend_col = st.columns(2)
+                with bar_col:
+                    st.plotly_chart(live_bar, use_container_width=True, key=f"live_bar_{redraws}")
+                with trend_col:
+                    st.plotly_chart(live_trend, use_container_width=True, key=f"live_trend_{redraws}")
+
+    with st.spinner("🔍 Analyzing sentiment and extracting keywords..."):
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        options = dict(
+            progress_callback=lambda i, total: progress_bar.progress(i / total),
+            metadata=metadata,
+            result_callback=on_result,
+            keyword_method=settings["keyword_method"],
+            escalation_threshold=settings["escalation_threshold"]
+        )
+        if settings["execution"] == "async":
+            results = run_batch_analyze_async(texts, concurrency=settings["parallelism"], **options)
+        elif settings["execution"] == "processes":
+            results = sharded_batch_analyze(
+                texts, workers=settings["parallelism"], max_rate=settings["max_rate"], **options
+            )
+        elif settings["execution"] == "multilingual":
+            results = batch_analyze_multilingual(texts, **options)
+        else:
+            results = batch_analyze_sentiment_with_keywords(texts, **options)
+        progress_bar.progress(1.0)
+        status_text.text("✅ Analysis complete!")
+    live_metrics.empty()
+    live_charts.empty()
+    st.success("🎉 Analysis completed successfully!")
+
+    try:
+        get_result_store().add_results(results)
+    except Exception as e:
+        st.warning(f"⚠️ Results could not be saved to history: {str(e)}")
+    return results, aggregator
+
+def render_history(filters):
+    """Render the stored results matching a submitted History search"""
+    version = get_result_store().version()
+    summary = summarize_history(filters, version)
+    history = search_history(filters, version)
+
+    total = sum(summary.values())
+    counted = total - summary.get("error", 0)
+    render_metrics(total, {
+        label: round(summary.get(label, 0) / counted * 100, 2) if counted else 0
+        for label in SENTIMENT_LABELS
+    })
+
+    if history:
+        history_df = results_to_dataframe(history)
+        history_df.insert(0, "analyzed_at", [datetime.fromtimestamp(r["analyzed_at"]) for r in history])
+        if total > len(history):
+            st.caption(f"Showing the {len(history)} most recent of {total} matching lines")
+        st.dataframe(history_df, use_container_width=True, hide_index=True)
+        st.download_button("⬇️ Download CSV", create_csv_download_link(history_df), "sentiment_history.csv", "text/csv", key="history_csv_download")
+    else:
+        st.info("No stored results match these filters.")
+
+def render_results(results, aggregator, key_prefix):
+    """Render metrics, charts, table and export buttons for a finished analysis"""
+    counts, percentages = aggregator.distribution()
+    df = results_to_dataframe(results)
+    document_summary = compute_sentiment_by_document(df)
+
+    # --- Metrics ---
+    render_metrics(len(results), percentages)
+
+    st.markdown("---")
+
+    # --- Visualization ---
+    st.markdown("### 📊 Visualization")
+    viz_col1, viz_col2 = st.columns(2)
+    with viz_col1:
+        st.plotly_chart(plot_sentiment_distribution_bar(counts), use_container_width=True)
+    with viz_col2:
+        st.plotly_chart(plot_sentiment_distribution_pie(counts), use_container_width=True)
+
+    st.markdown("#### 📈 Sentiment Trend Over Inputs")
+    st.plotly_chart(plot_sentiment_line_chart(df), use_container_width=True)
+
+    # --- Top Keywords ---
+    st.markdown("### 🔑 Top Keywords by Sentiment")
+    keyword_cols = st.columns(len(SENTIMENT_LABELS))
+    for col, label in zip(keyword_cols, SENTIMENT_LABELS):
+        with col:
+            st.markdown(f"**{label.title()}**")
+            top_keywords = pd.DataFrame(aggregator.top_keywords(label, 10), columns=["Keyword", "Count"])
+            st.dataframe(top_keywords, use_container_width=True, hide_index=True)
+
+    # --- Tiered Scoring ---
+    lexicon_lines = sum(1 for r in results if r.get("tier") == "lexicon")
+    if lexicon_lines:
+        st.caption(f"⚡ {lexicon_lines} of {len(results)} lines were scored by the lexicon without a model call")
+    with st.expander("🎯 Tiered scoring calibration"):
+        st.markdown(
+            "How often the lexicon agrees with the model on this run, "
+            "and the share of model calls each escalation threshold would save."
+        )
+        calibration = pd.DataFrame(calibration_report(results))
+        shadow_lines = int(calibration["shadow_lines"].iloc[0]) if len(calibration) else 0
+        if lexicon_lines and shadow_lines:
+            st.caption(
+                f"Sample: {len(results) - lexicon_lines} model-scored lines plus {shadow_lines} of the "
+                f"{lexicon_lines} lexicon-handled lines, also scored by the model and weighted up to all of them."
+            )
+        elif lexicon_lines:
+            st.caption(
+                "Sample: model-scored lines only. No lexicon-handled line was in the shadow sample, so "
+                "lines the lexicon was unsure about are over-represented."
+            )
+        else:
+            st.caption("Sample: every line of this run, all scored by the model.")
+        calibration = calibration.drop(columns="shadow_lines")
+        calibration.columns = ["Threshold", "Lines", "Lexicon would handle", "Model calls saved (%)", "Agreement (%)"]
+        st.dataframe(calibration, use_container_width=True, hide_index=True)
+
+    # --- Per-Document Breakdown ---
+    if len(document_summary) > 1:
+        st.markdown("### 🗂️ Sentiment by Document")
+        st.plotly_chart(plot_sentiment_by_document(document_summary), use_container_width=True)
+        st.dataframe(document_summary, use_container_width=True, hide_index=True)
+
+    # --- Table ---
+    st.markdown("### 📋 Detailed Results")
+    st.dataframe(df, use_container_width=True)
+
+    # --- Export ---
+    st.markdown("### 📤 Export Results")
+    col_csv, col_json, col_pdf = st.columns(3)
+    with col_csv:
+        st.download_button("⬇️ Download CSV", create_csv_download_link(df), "sentiment_results.csv", "text/csv", key=f"{key_prefix}_csv_download")
+    with col_json:
+        json_data = df.to_json(orient="records", indent=2)
+        st.download_button("⬇️ Download JSON", json_data, "sentiment_results.json", "application/json", key=f"{key_prefix}_json_download")
+    with col_pdf:
+        try:
+            with st.spinner("📄 Generating PDF..."):
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+                    pdf_filename = export_to_pdf(df, tmp_file.name, counts=counts, document_summary=document_summary)
+                
+                with open(pdf_filename, "rb") as f:
+                    pdf_data = f.read()
+                
+                os.remove(pdf_filename)
+            st.download_button("⬇️ Download PDF", pdf_data, "sentiment_results.pdf", "application/pdf", key=f"{key_prefix}_pdf_download")
+        except Exception as e:
+            st.error(f"PDF export error: {str(e)}")
+
 # --- Input Section ---
 st.markdown("### 📝 Enter or Upload Text")
 
-tab1, tab2 = st.tabs(["✍️ Manual Entry", "📁 Upload File"])
+tab1, tab2, tab3 = st.tabs(["✍️ Manual Entry", "📁 Upload File", "🗂️ History"])
 texts = []
 
 with tab1:
@@ -147,204 +455,94 @@ with tab1:
     # --- Analysis Settings ---
     if user_input:
         texts = [line.strip() for line in user_input.splitlines() if line.strip()]
-        st.markdown("### ⚙️ Analysis Settings")
-        delay = st.slider("Delay between API calls (seconds)", 0.5, 3.0, 1.0, 0.5, key="manual_delay_slider")
-        st.info(f"⏱️ Estimated analysis time: {len(texts) * delay:.1f} seconds")
-    else:
-        delay = st.slider("Delay between API calls (seconds)", 0.5, 3.0, 1.0, 0.5, key="manual_delay_slider_disabled")
+        settings = render_analysis_settings(texts, "manual")
     
     analyze = st.button("✨ How does it feel?", type="primary", disabled=not user_input, key="manual_analyze_button")
 
     if analyze and user_input:
         texts = [line.strip() for line in user_input.splitlines() if line.strip()]
-        with st.spinner("🔍 Analyzing sentiment and extracting keywords..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            results = batch_analyze_sentiment_with_keywords(
-                texts, 
-                delay=delay, 
-                progress_callback=lambda i, total: progress_bar.progress(i / total)
-            )
-            progress_bar.progress(1.0)
-            status_text.text("✅ Analysis complete!")
-        st.success("🎉 Analysis completed successfully!")
-
-        counts, percentages = compute_sentiment_distribution(results)
-        df = results_to_dataframe(results)
-
-        # --- Metrics ---
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>Total</h3><h2>{len(results)}</h2>
-            </div>""", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>😊 Positive</h3><h2>{percentages.get('positive', 0):.1f}%</h2>
-            </div>""", unsafe_allow_html=True)
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>😐 Neutral</h3><h2>{percentages.get('neutral', 0):.1f}%</h2>
-            </div>""", unsafe_allow_html=True)
-        with col4:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>😞 Negative</h3><h2>{percentages.get('negative', 0):.1f}%</h2>
-            </div>""", unsafe_allow_html=True)
-
-        st.markdown("---")
-
-        # --- Visualization ---
-        st.markdown("### 📊 Visualization")
-        viz_col1, viz_col2 = st.columns(2)
-        with viz_col1:
-            st.plotly_chart(plot_sentiment_distribution_bar(counts), use_container_width=True)
-        with viz_col2:
-            st.plotly_chart(plot_sentiment_distribution_pie(counts), use_container_width=True)
-
-        st.markdown("#### 📈 Sentiment Trend Over Inputs")
-        st.plotly_chart(plot_sentiment_line_chart(df), use_container_width=True)
-
-        # --- Table ---
-        st.markdown("### 📋 Detailed Results")
-        st.dataframe(df, use_container_width=True)
-
-        # --- Export ---
-        st.markdown("### 📤 Export Results")
-        col_csv, col_json, col_pdf = st.columns(3)
-        with col_csv:
-            st.download_button("⬇️ Download CSV", create_csv_download_link(df), "sentiment_results.csv", "text/csv", key="manual_csv_download")
-        with col_json:
-            json_data = df.to_json(orient="records", indent=2)
-            st.download_button("⬇️ Download JSON", json_data, "sentiment_results.json", "application/json", key="manual_json_download")
-        with col_pdf:
-            try:
-                with st.spinner("📄 Generating PDF..."):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                        pdf_filename = export_to_pdf(df, tmp_file.name, counts=counts)
-                    
-                    with open(pdf_filename, "rb") as f:
-                        pdf_data = f.read()
-                    
-                    os.remove(pdf_filename)
-                st.download_button("⬇️ Download PDF", pdf_data, "sentiment_results.pdf", "application/pdf", key="manual_pdf_download")
-            except Exception as e:
-                st.error(f"PDF export error: {str(e)}")
+        results, aggregator = run_analysis(texts, settings)
+        render_results(results, aggregator, "manual")
 
 with tab2:
-    uploaded_file = st.file_uploader("Upload a file", type=["txt", "pdf", "docx"], key="file_uploader")
+    uploaded_files = st.file_uploader(
+        "Upload files or ZIP archives",
+        type=["txt", "pdf", "docx", "zip"],
+        accept_multiple_files=True,
+        key="file_uploader"
+    )
     
     # Initialize texts variable
     texts = []
+    lines = []
     
-    if uploaded_file:
-        file_type = uploaded_file.name.split(".")[-1].lower()
-        content = ""
+    if uploaded_files:
         try:
-            if file_type == "txt":
-                content = StringIO(uploaded_file.getvalue().decode("utf-8")).read()
-            elif file_type == "docx":
-                content = docx2txt.process(uploaded_file)
-            elif file_type == "pdf":
-                pdf = fitz.open(stream=uploaded_file.read(), filetype="pdf")
-                for page in pdf:
-                    content += page.get_text()
-                pdf.close()
-            if content:
-                texts = [line.strip() for line in content.splitlines() if line.strip()]
-                st.success(f"✅ Extracted {len(texts)} lines from {uploaded_file.name}")
+            with st.spinner("📂 Extracting text from files..."):
+                lines, errors = extract_uploaded_files(
+                    tuple((f.name, f.getvalue()) for f in uploaded_files)
+                )
+            for filename, error in errors.items():
+                st.error(f"❌ Error reading {filename}: {error}")
+            if lines:
+                texts = [line["text"] for line in lines]
+                documents = len({line["source"] for line in lines})
+                st.success(f"✅ Extracted {len(texts)} lines from {documents} document(s)")
         except Exception as e:
-            st.error(f"❌ Error reading file: {str(e)}")
+            st.error(f"❌ Error reading files: {str(e)}")
 
     # --- Analysis Settings ---
-    if uploaded_file and texts:
-        st.markdown("### ⚙️ Analysis Settings")
-        delay = st.slider("Delay between API calls (seconds)", 0.5, 3.0, 1.0, 0.5, key="upload_delay_slider")
-        st.info(f"⏱️ Estimated analysis time: {len(texts) * delay:.1f} seconds")
-    else:
-        delay = st.slider("Delay between API calls (seconds)", 0.5, 3.0, 1.0, 0.5, key="upload_delay_slider_disabled")
+    if uploaded_files and texts:
+        settings = render_analysis_settings(texts, "upload")
     
-    analyze = st.button("✨ How does it feel?", type="primary", disabled=not uploaded_file, key="upload_analyze_button")
+    analyze = st.button("✨ How does it feel?", type="primary", disabled=not uploaded_files, key="upload_analyze_button")
     
     if analyze and texts:
-        with st.spinner("🔍 Analyzing sentiment and extracting keywords..."):
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            results = batch_analyze_sentiment_with_keywords(
-                texts, 
-                delay=delay, 
-                progress_callback=lambda i, total: progress_bar.progress(i / total)
-            )
-            progress_bar.progress(1.0)
-            status_text.text("✅ Analysis complete!")
-        st.success("🎉 Analysis completed successfully!")
-
-        counts, percentages = compute_sentiment_distribution(results)
-        df = results_to_dataframe(results)
-
-        # --- Metrics ---
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>Total</h3><h2>{len(results)}</h2>
-            </div>""", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>😊 Positive</h3><h2>{percentages.get('positive', 0):.1f}%</h2>
-            </div>""", unsafe_allow_html=True)
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>😐 Neutral</h3><h2>{percentages.get('neutral', 0):.1f}%</h2>
-            </div>""", unsafe_allow_html=True)
-        with col4:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>😞 Negative</h3><h2>{percentages.get('negative', 0):.1f}%</h2>
-            </div>""", unsafe_allow_html=True)
-
-        st.markdown("---")
-
-        # --- Visualization ---
-        st.markdown("### 📊 Visualization")
-        viz_col1, viz_col2 = st.columns(2)
-        with viz_col1:
-            st.plotly_chart(plot_sentiment_distribution_bar(counts), use_container_width=True)
-        with viz_col2:
-            st.plotly_chart(plot_sentiment_distribution_pie(counts), use_container_width=True)
-
-        st.markdown("#### 📈 Sentiment Trend Over Inputs")
-        st.plotly_chart(plot_sentiment_line_chart(df), use_container_width=True)
-
-        # --- Table ---
-        st.markdown("### 📋 Detailed Results")
-        st.dataframe(df, use_container_width=True)
-
-        # --- Export ---
-        st.markdown("### 📤 Export Results")
-        col_csv, col_json, col_pdf = st.columns(3)
-        with col_csv:
-            st.download_button("⬇️ Download CSV", create_csv_download_link(df), "sentiment_results.csv", "text/csv", key="upload_csv_download")
-        with col_json:
-            json_data = df.to_json(orient="records", indent=2)
-            st.download_button("⬇️ Download JSON", json_data, "sentiment_results.json", "application/json", key="upload_json_download")
-        with col_pdf:
-            try:
-                with st.spinner("📄 Generating PDF..."):
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                        pdf_filename = export_to_pdf(df, tmp_file.name, counts=counts)
-                    
-                    with open(pdf_filename, "rb") as f:
-                        pdf_data = f.read()
-                    
-                    os.remove(pdf_filename)
-                st.download_button("⬇️ Download PDF", pdf_data, "sentiment_results.pdf", "application/pdf", key="upload_pdf_download")
-            except Exception as e:
-                st.error(f"PDF export error: {str(e)}")
+        results, aggregator = run_analysis(
+            texts,
+            settings,
+            metadata=[{"source": line["source"], "page": line["page"]} for line in lines]
+        )
+        render_results(results, aggregator, "upload")
+
+with tab3:
+    st.markdown("Search every analysis run on this server.")
+    # Every tab runs on every rerun, so the store is only queried for submitted searches
+    history_form = st.form("history_filters", border=False)
+    search_col, sentiment_col = history_form.columns([2, 1])
+    with search_col:
+        history_query = st.text_input("Search text and keywords", placeholder="e.g. refund", key="history_query")
+    with sentiment_col:
+        history_sentiments = st.multiselect(
+            "Sentiment", ["Positive", "Neutral", "Negative", "Error"], key="history_sentiments"
+        )
+    date_col, confidence_col, source_col = history_form.columns(3)
+    with date_col:
+        history_dates = st.date_input(
+            "Analyzed between",
+            (datetime.now().date() - timedelta(days=7), datetime.now().date()),
+            key="history_dates"
+        )
+    with confidence_col:
+        history_confidence = st.slider("Minimum confidence (%)", 0, 100, 0, 5, key="history_confidence")
+    with source_col:
+        history_source = st.text_input("Source file contains", key="history_source")
+    if history_form.form_submit_button("🔍 Search"):
+        filters = {
+            "query": history_query,
+            "sentiments": history_sentiments,
+            "min_confidence": history_confidence / 100,
+            "source": history_source
+        }
+        if len(history_dates) == 2:
+            filters["since"] = datetime.combine(history_dates[0], dt_time.min).timestamp()
+            filters["until"] = datetime.combine(history_dates[1] + timedelta(days=1), dt_time.min).timestamp()
+        st.session_state["history_search"] = filters
+
+    history_filters = st.session_state.get("history_search")
+    if history_filters is None:
+        st.info("Set the filters and press Search to load stored results.")
+    else:
+        render_history(history_filters)
 
 st.markdown('</div>', unsafe_allow_html=True)
@@ -1,107 +1,195 @@
+import hashlib
+import threading
+from collections import OrderedDict
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+from utils.aggregation import SentimentAggregator
 
-def compute_sentiment_distribution(results):
-    counts = {"positive": 0, "neutral": 0, "negative": 0}
-    total = 0
+SENTIMENT_COLORS = {
+    "positive": "#28a745",
+    "neutral": "#ffc107",
+    "negative": "#dc3545"
+}
 
-    for r in results:
-        if "sentiment" in r and isinstance(r['sentiment'], list):
-            sentiments = r['sentiment']
-            top = sentiments[0]
+FIGURE_CACHE_SIZE = 128
+# Live trend charts are downsampled to at most this many points per redraw
+LIVE_TREND_MAX_POINTS = 500
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
 
-            if top['score'] < 0.6:
-                label = "neutral"
-            else:
-                label = top['label']
+def _cached_figure(key, build):
+    """
+    Return the figure for a data fingerprint, building it only on a cache miss.
+    The cache is process-wide, so sessions with identical inputs share one
+    figure object; callers must treat cached figures as read-only.
+    """
+    with _figure_cache_lock:
+        fig = _figure_cache.get(key)
+        if fig is not None:
+            _figure_cache.move_to_end(key)
+            return fig
 
-            if label in counts:
-                counts[label] += 1
-                total += 1
-        elif "error" in r:
-            counts["neutral"] += 1
-            total += 1
+    fig = build()
+    with _figure_cache_lock:
+        _figure_cache[key] = fig
+        if len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return fig
 
-    if total == 0:
-        return counts, {}
+def compute_sentiment_distribution(results):
+    return SentimentAggregator().update(results).distribution()
 
-    percentages = {k: round((v / total) * 100, 2) for k, v in counts.items()}
-    return counts, percentages
+def result_to_row(r):
+    """Flatten one analysis result into a results table row"""
+    if "sentiment" in r and isinstance(r['sentiment'], list):
+        sentiments = r["sentiment"]
+        top = sentiments[0]
 
-def results_to_dataframe(results):
-    rows = []
-    for r in results:
-        if "sentiment" in r and isinstance(r['sentiment'], list):
-            sentiments = r["sentiment"]
-            top = sentiments[0]
-
-            if top["score"] < 0.6:
-                label = "neutral"
-            else:
-                label = top["label"]
-
-            rows.append({
-                "text": r["text"][:100] + "..." if len(r["text"]) > 100 else r["text"],
-                "sentiment": label.title(),
-                "confidence": f"{round(top['score'] * 100, 2)}%",
-                "keywords": ", ".join(r.get("keywords", []))
-            })
+        if top["score"] < 0.6:
+            label = "neutral"
         else:
-            rows.append({
-                "text": r["text"][:100] + "..." if len(r["text"]) > 100 else r["text"],
-                "sentiment": "Error",
-                "confidence": "N/A",
-                "keywords": "N/A"
-            })
-    
-    return pd.DataFrame(rows)
+            label = top["label"]
 
-def plot_sentiment_distribution_bar(counts):
-    df = pd.DataFrame(list(counts.items()), columns=["Sentiment", "Count"])
-    fig = px.bar(
-        df, 
-        x="Sentiment", 
-        y="Count", 
-        color="Sentiment",
-        color_discrete_map={
-            "positive": "#28a745", 
-            "neutral": "#ffc107", 
-            "negative": "#dc3545"
-        },
-        title="Sentiment Distribution"
+        row = {
+            "text": r["text"][:100] + "..." if len(r["text"]) > 100 else r["text"],
+            "sentiment": label.title(),
+            "confidence": f"{round(top['score'] * 100, 2)}%",
+            "keywords": ", ".join(r.get("keywords", []))
+        }
+    else:
+        row = {
+            "text": r["text"][:100] + "..." if len(r["text"]) > 100 else r["text"],
+            "sentiment": "Error",
+            "confidence": "N/A",
+            "keywords": "N/A"
+        }
+
+    # Lines extracted from uploaded files keep their origin
+    if "source" in r:
+        row["source"] = r["source"]
+        row["page"] = r.get("page", 1)
+    if "language" in r:
+        row["language"] = r["language"]
+    return row
+
+def results_to_dataframe(results):
+    return pd.DataFrame([result_to_row(r) for r in results])
+
+def compute_sentiment_by_document(df):
+    """Break a results dataframe down into sentiment counts per source document"""
+    if "source" not in df.columns or df.empty:
+        return pd.DataFrame(columns=["source", "Positive", "Neutral", "Negative", "Error", "Total"])
+
+    summary = pd.crosstab(df["source"], df["sentiment"])
+    summary = summary.reindex(columns=["Positive", "Neutral", "Negative", "Error"], fill_value=0)
+    summary["Total"] = summary.sum(axis=1)
+    # Keep documents in upload order rather than alphabetical
+    summary = summary.reindex(df["source"].unique()).rename_axis(columns=None)
+    return summary.reset_index()
+
+def plot_sentiment_by_document(summary):
+    """Stacked bar chart of sentiment counts per source document"""
+    key = ("document", tuple(summary[["source", "Positive", "Neutral", "Negative"]].itertuples(index=False)))
+
+    def build():
+        fig = go.Figure(
+            [
+                go.Bar(
+                    name=label,
+                    x=summary["source"].tolist(),
+                    y=summary[label].tolist(),
+                    marker_color=SENTIMENT_COLORS[label.lower()]
+                )
+                for label in ["Positive", "Neutral", "Negative"]
+            ]
+        )
+        fig.update_layout(
+            barmode="stack",
+            title="Sentiment by Document",
+            xaxis_title="Document",
+            yaxis_title="Count",
+            legend_title="Sentiment"
+        )
+        return fig
+
+    return _cached_figure(key, build)
+
+def build_distribution_bar(counts):
+    """Build a fresh (uncached) distribution bar chart, e.g. for live patching"""
+    fig = go.Figure(
+        go.Bar(
+            x=list(counts),
+            y=list(counts.values()),
+            marker_color=[SENTIMENT_COLORS.get(label, "#cccccc") for label in counts]
+        )
     )
-    fig.update_layout(showlegend=False)
+    fig.update_layout(
+        title="Sentiment Distribution",
+        xaxis_title="Sentiment",
+        yaxis_title="Count",
+        showlegend=False
+    )
+    return fig
+
+def update_distribution_bar(fig, counts):
+    """Patch the bar heights of a figure from build_distribution_bar in place"""
+    fig.data[0].y = list(counts.values())
     return fig
 
+def plot_sentiment_distribution_bar(counts):
+    return _cached_figure(("bar", tuple(counts.items())), lambda: build_distribution_bar(counts))
+
 def plot_sentiment_distribution_pie(counts):
-    df = pd.DataFrame(list(counts.items()), columns=["Sentiment", "Count"])
-    fig = px.pie(
-        df,
-        names="Sentiment",
-        values="Count",
-        title="Sentiment Distribution",
-        color="Sentiment",
-        color_discrete_map={
-            "positive": "#28a745",
-            "neutral": "#ffc107",
-            "negative": "#dc3545"
-        }
+    def build():
+        fig = go.Figure(
+            go.Pie(
+                labels=list(counts),
+                values=list(counts.values()),
+                marker_colors=[SENTIMENT_COLORS.get(label, "#cccccc") for label in counts]
+            )
+        )
+        fig.update_layout(title="Sentiment Distribution", legend_title="Sentiment")
+        return fig
+
+    return _cached_figure(("pie", tuple(counts.items())), build)
+
+def build_sentiment_line_chart(labels=()):
+    """Build a fresh (uncached) sentiment trend chart, e.g. for live patching"""
+    fig = go.Figure(
+        go.Scatter(
+            x=list(range(1, len(labels) + 1)),
+            y=list(labels),
+            mode="lines+markers",
+            line_color="#28a745"
+        )
+    )
+    fig.update_layout(
+        title="Sentiment Trend Over Inputs",
+        xaxis_title="Text Number",
+        yaxis_title="Sentiment"
     )
     return fig
 
+def update_sentiment_trend(fig, labels, max_points=LIVE_TREND_MAX_POINTS):
+    """
+    Point a figure from build_sentiment_line_chart at the labels seen so far,
+    in place. labels is the caller's running list; past max_points it is
+    downsampled by a fixed stride (keeping the latest point), so each redraw
+    sends a bounded number of points however long the run gets.
+    """
+    stride = -(-len(labels) // max_points) if labels else 1
+    x = list(range(1, len(labels) + 1, stride))
+    y = labels[::stride]
+    if labels and x[-1] != len(labels):
+        x.append(len(labels))
+        y.append(labels[-1])
+    trace = fig.data[0]
+    trace.x = x
+    trace.y = y
+    return fig
+
 def plot_sentiment_line_chart(df):
     """Create a line chart showing sentiment trend over inputs"""
-    df = df.copy()
-    df["Index"] = range(1, len(df) + 1)
-
-    fig = px.line(
-        df,
-        x="Index",
-        y="sentiment",
-        markers=True,
-        title="Sentiment Trend Over Inputs",
-        labels={"Index": "Text Number", "sentiment": "Sentiment"},
-        color_discrete_sequence=["#28a745", "#ffc107", "#dc3545"]
-    )
-    fig.update_traces(mode="lines+markers")
-    return fig
+    labels = tuple(df["sentiment"].tolist())
+    fingerprint = hashlib.blake2b("\x1f".join(labels).encode("utf-8"), digest_size=16).hexdigest()
+    return _cached_figure(("line", len(labels), fingerprint), lambda: build_sentiment_line_chart(labels))
@@ -1,7 +1,9 @@
 import pandas as pd
 import streamlit as st
 from datetime import datetime
+import csv
 import os
+from components.data_visualization import result_to_row
 
 def export_to_csv(data, filename=None):
     """Export sentiment data to CSV file"""
@@ -30,4 +32,26 @@ def create_csv_download_link(data):
         df = data
     
     csv = df.to_csv(index=False)
-    return csv
\ No newline at end of file
+    return csv
+
+class CsvStreamWriter:
+    """
+    Append analysis results to a CSV file one row at a time.
+    Rows use the same columns as results_to_dataframe; the header is taken
+    from the first result written.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, "w", newline="", encoding="utf-8")
+        self._writer = None
+
+    def write(self, result):
+        row = result_to_row(result)
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row), extrasaction="ignore", restval="")
+            self._writer.writeheader()
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
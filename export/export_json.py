@@ -23,4 +23,17 @@ def create_json_download_data(data):
     if isinstance(data, pd.DataFrame):
         return data.to_json(orient='records', indent=2)
     else:
-        return json.dumps(data, indent=2)
\ No newline at end of file
+        return json.dumps(data, indent=2)
+
+class JsonlStreamWriter:
+    """Append raw analysis results to a JSON Lines file, one result per line"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, "w", encoding="utf-8")
+
+    def write(self, result):
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._file.close()
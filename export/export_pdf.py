@@ -133,8 +133,11 @@ def create_line_chart_for_pdf(df):
     
     return temp_file.name
 
-def export_to_pdf(data, filename=None, counts=None):
-    """Export sentiment data to PDF file with graphs"""
+def export_to_pdf(data, filename=None, counts=None, document_summary=None):
+    """
+    Export sentiment data to PDF file with graphs.
+    document_summary is the optional per-document breakdown from compute_sentiment_by_document.
+    """
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"sentiment_analysis_{timestamp}.pdf"
@@ -233,5 +236,33 @@ def export_to_pdf(data, filename=None, counts=None):
         pdf.cell(50, 8, keywords, 1)
         pdf.ln()
 
+    # Add per-document breakdown for multi-file uploads
+    if document_summary is not None and not document_summary.empty:
+        pdf.add_page()
+        pdf.set_font("Arial", 'B', 14)
+        pdf.cell(0, 10, "5. Per-Document Breakdown", 0, 1)
+        pdf.ln(10)
+
+        pdf.set_font("Arial", 'B', 10)
+        pdf.cell(90, 8, "Document", 1)
+        for column in ["Positive", "Neutral", "Negative", "Error", "Total"]:
+            pdf.cell(20, 8, column, 1)
+        pdf.ln()
+
+        pdf.set_font("Arial", size=8)
+        for _, row in document_summary.iterrows():
+            if pdf.get_y() > 250:
+                pdf.add_page()
+                pdf.set_font("Arial", size=8)
+
+            source = str(row['source'])
+            source = "..." + source[-52:] if len(source) > 55 else source
+            source = source.encode('ascii', 'ignore').decode('ascii')
+
+            pdf.cell(90, 8, source, 1)
+            for column in ["Positive", "Neutral", "Negative", "Error", "Total"]:
+                pdf.cell(20, 8, str(row[column]), 1)
+            pdf.ln()
+
     pdf.output(filename)
     return filename
\ No newline at end of file
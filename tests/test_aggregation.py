@@ -0,0 +1,96 @@
+import unittest
+from utils.aggregation import MisraGries, SentimentAggregator, get_sentiment_label
+from components.data_visualization import compute_sentiment_distribution
+
+def make_result(label, score, keywords=()):
+    return {"text": "t", "sentiment": [{"label": label, "score": score}], "keywords": list(keywords)}
+
+class TestAggregation(unittest.TestCase):
+    def setUp(self):
+        self.results = [
+            make_result("positive", 0.95, ["price", "service"]),
+            make_result("positive", 0.85, ["price"]),
+            make_result("negative", 0.90, ["refund"]),
+            make_result("negative", 0.55, ["delivery"]),
+            {"text": "t", "error": "boom"},
+            {"text": "t", "sentiment": {"error": "API error 500"}},
+        ]
+
+    def test_low_confidence_counts_as_neutral(self):
+        self.assertEqual(get_sentiment_label(self.results[3]), ("neutral", 0.55))
+        self.assertEqual(get_sentiment_label(self.results[4]), ("neutral", None))
+        self.assertEqual(get_sentiment_label(self.results[5]), (None, None))
+
+    def test_distribution_matches_counts(self):
+        counts, percentages = compute_sentiment_distribution(self.results)
+        self.assertEqual(counts, {"positive": 2, "neutral": 2, "negative": 1})
+        self.assertEqual(percentages, {"positive": 40.0, "neutral": 40.0, "negative": 20.0})
+
+    def test_empty_distribution(self):
+        counts, percentages = SentimentAggregator().distribution()
+        self.assertEqual(counts, {"positive": 0, "neutral": 0, "negative": 0})
+        self.assertEqual(percentages, {})
+
+    def test_confidence_and_histogram(self):
+        aggregator = SentimentAggregator().update(self.results)
+        self.assertAlmostEqual(aggregator.mean_confidence("positive"), 0.9)
+        self.assertAlmostEqual(aggregator.mean_confidence("neutral"), 0.55)
+        self.assertEqual(aggregator.histograms["positive"][9], 1)
+        self.assertEqual(aggregator.histograms["positive"][8], 1)
+        self.assertEqual(aggregator.errors, 1)
+
+    def test_merge_equals_single_pass(self):
+        whole = SentimentAggregator().update(self.results)
+        left = SentimentAggregator().update(self.results[:3])
+        right = SentimentAggregator().update(self.results[3:])
+        merged = left.merge(right)
+        self.assertEqual(merged.distribution(), whole.distribution())
+        self.assertEqual(merged.histograms, whole.histograms)
+        self.assertEqual(merged.top_keywords("positive"), whole.top_keywords("positive"))
+
+    def test_subtract_undoes_merge(self):
+        left = SentimentAggregator().update(self.results[:3])
+        right = SentimentAggregator().update(self.results[3:])
+        whole = SentimentAggregator().update(self.results).subtract(right)
+        self.assertEqual(whole.distribution(), left.distribution())
+        self.assertEqual(whole.histograms, left.histograms)
+        self.assertEqual(whole.errors, 0)
+        self.assertEqual(whole.top_keywords("neutral"), [])
+        self.assertEqual(whole.top_keywords("positive"), left.top_keywords("positive"))
+
+    def test_round_trips_through_json(self):
+        import json
+        aggregator = SentimentAggregator().update(self.results)
+        restored = SentimentAggregator.from_dict(json.loads(json.dumps(aggregator.to_dict())))
+        self.assertEqual(restored.distribution(), aggregator.distribution())
+        self.assertEqual(restored.histograms, aggregator.histograms)
+        self.assertEqual(restored.errors, aggregator.errors)
+        self.assertEqual(restored.top_keywords("positive"), aggregator.top_keywords("positive"))
+        restored.add(make_result("negative", 0.9))
+        self.assertEqual(restored.counts["negative"], 2)
+
+    def test_top_keywords_by_sentiment(self):
+        aggregator = SentimentAggregator().update(self.results)
+        self.assertEqual(aggregator.top_keywords("positive"), [("price", 2), ("service", 1)])
+        self.assertEqual(aggregator.top_keywords("neutral"), [("delivery", 1)])
+
+    def test_misra_gries_keeps_heavy_hitters(self):
+        sketch = MisraGries(capacity=3)
+        for i in range(300):
+            sketch.add("refund")
+            sketch.add(f"rare{i}")
+        self.assertLessEqual(len(sketch.counters), 3)
+        self.assertEqual(sketch.top(1)[0][0], "refund")
+
+    def test_misra_gries_merge_respects_capacity(self):
+        a, b = MisraGries(capacity=2), MisraGries(capacity=2)
+        a.add("x", 5)
+        a.add("y", 1)
+        b.add("x", 3)
+        b.add("z", 2)
+        a.merge(b)
+        self.assertLessEqual(len(a.counters), 2)
+        self.assertEqual(a.top(1)[0][0], "x")
+
+if __name__ == "__main__":
+    unittest.main()
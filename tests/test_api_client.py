@@ -1,3 +1,4 @@
+import threading
 import unittest
 from unittest.mock import patch, Mock
 from utils import api_client
@@ -11,7 +12,7 @@ class TestAPIClient(unittest.TestCase):
             {"label": "LABEL_0", "score": 0.02}
             ]
     
-    @patch("utils.api_client.requests.post")
+    @patch("utils.api_client.requests.Session.post")
     def test_analyze_sentiment_success(self, mock_post):
         mock_post.return_value = Mock(status_code=200)
         mock_post.return_value.json.return_value = [self.sample_response]
@@ -21,13 +22,41 @@ class TestAPIClient(unittest.TestCase):
         self.assertEqual(result[0]["label"], "positive")
         self.assertGreater(result[0]["score"], 0.8)
 
-    @patch("utils.api_client.requests.post")
+    @patch("utils.api_client.requests.Session.post")
     def test_analyze_sentiment_failure(self, mock_post):
         mock_post.return_value = Mock(status_code=403, text="Forbidden")
         result = api_client.analyze_sentiment(self.sample_text)
         self.assertIsInstance(result, dict)
         self.assertIn("error", result)
 
+    @patch("utils.api_client.requests.Session.post")
+    def test_analyze_sentiment_retries_when_throttled(self, mock_post):
+        throttled = Mock(status_code=429, text="Too Many Requests")
+        success = Mock(status_code=200)
+        success.json.return_value = [self.sample_response]
+        mock_post.side_effect = [throttled, success]
+        controller = Mock()
+
+        result = api_client.analyze_sentiment(self.sample_text, controller=controller)
+        self.assertEqual(result[0]["label"], "positive")
+        self.assertEqual(controller.acquire.call_count, 2)
+        self.assertEqual([c.args[1] for c in controller.record.call_args_list], [429, 200])
+
+    def test_one_session_per_endpoint(self):
+        session = api_client.get_http_session("http://example.test/a")
+        self.assertIs(api_client.get_http_session("http://example.test/a"), session)
+        self.assertIsNot(api_client.get_http_session("http://example.test/b"), session)
+        self.assertEqual(session.headers["Authorization"], api_client.HEADERS["Authorization"])
+
+    def test_threads_get_own_sessions_on_shared_pool(self):
+        session = api_client.get_http_session("http://example.test/a")
+        other = []
+        thread = threading.Thread(target=lambda: other.append(api_client.get_http_session("http://example.test/a")))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], session)
+        self.assertIs(other[0].get_adapter("http://example.test/a"), session.get_adapter("http://example.test/a"))
+
     @patch("utils.api_client.analyze_sentiment")
     @patch("utils.api_client.extract_keywords")
     def test_batch_analyze_sentiment_with_keywords(self, mock_keywords, mock_sentiment):
@@ -47,6 +76,28 @@ class TestAPIClient(unittest.TestCase):
             self.assertIn("sentiment", r)
             self.assertIn("keywords", r)
 
+    @patch("utils.api_client.analyze_sentiment")
+    def test_batch_tiered_scoring_escalates_ambiguous_lines(self, mock_sentiment):
+        mock_sentiment.return_value = [{"label": "neutral", "score": 0.8}]
+        input_texts = ["I love it, amazing product!", "The parcel arrived on Tuesday"]
+        results = api_client.batch_analyze_sentiment_with_keywords(input_texts, delay=0, escalation_threshold=0.85)
+
+        self.assertEqual([r["tier"] for r in results], ["lexicon", "model"])
+        self.assertEqual(results[0]["sentiment"][0]["label"], "positive")
+        mock_sentiment.assert_called_once()
+
+    @patch("utils.api_client.analyze_sentiment")
+    def test_batch_tiered_scoring_shadow_scores_sampled_lines(self, mock_sentiment):
+        mock_sentiment.return_value = [{"label": "positive", "score": 0.9}]
+        # In the shadow sample, unlike "I love it, amazing product!"
+        results = api_client.batch_analyze_sentiment_with_keywords(
+            ["Great product, love it 0"], delay=0, escalation_threshold=0.85
+        )
+
+        self.assertEqual(results[0]["tier"], "lexicon")
+        self.assertEqual(results[0]["shadow"], [{"label": "positive", "score": 0.9}])
+        mock_sentiment.assert_called_once()
+
     @patch("utils.api_client.analyze_sentiment", side_effect=Exception("Test error"))
     def test_batch_handles_exception(self, mock_sentiment):
         input_texts = ["This will fail"]
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+import httpx
+from utils import async_client
+from utils.rate_controller import AdaptiveRateController
+
+def sentiment_response(text):
+    score = 0.9 if "good" in text else 0.1
+    return httpx.Response(200, json=[[
+        {"label": "LABEL_2", "score": score},
+        {"label": "LABEL_0", "score": 1 - score}
+    ]])
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        controller = AdaptiveRateController(initial_rate=10000, max_rate=10000)
+        patcher = patch("utils.async_client.get_rate_controller", return_value=controller)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_analyze_sentiment_async_maps_labels(self):
+        transport = httpx.MockTransport(lambda request: sentiment_response(request.content.decode()))
+        async with httpx.AsyncClient(transport=transport) as client:
+            result = await async_client.analyze_sentiment_async("good stuff", client)
+        self.assertEqual(result[0], {"label": "positive", "score": 0.9})
+
+    async def test_analyze_sentiment_async_retries_when_throttled(self):
+        responses = [httpx.Response(429, text="Too Many Requests"), sentiment_response("good")]
+        transport = httpx.MockTransport(lambda request: responses.pop(0))
+        controller = AdaptiveRateController(initial_rate=10000, max_rate=10000)
+        async with httpx.AsyncClient(transport=transport) as client:
+            result = await async_client.analyze_sentiment_async("good", client, controller)
+        self.assertEqual(result[0]["label"], "positive")
+
+    async def test_analyze_sentiment_async_error(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(403, text="Forbidden"))
+        async with httpx.AsyncClient(transport=transport) as client:
+            result = await async_client.analyze_sentiment_async("text", client)
+        self.assertIn("error", result)
+
+    async def test_batch_keeps_order_and_bounds_concurrency(self):
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return sentiment_response(request.content.decode())
+
+        texts = [f"good {i}" if i % 2 else f"bad {i}" for i in range(30)]
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            results = await async_client.batch_analyze_sentiment_async(
+                texts, concurrency=4, client=client, keyword_method="tfidf"
+            )
+        self.assertEqual([r["text"] for r in results], texts)
+        self.assertEqual(results[1]["sentiment"][0]["label"], "positive")
+        self.assertLessEqual(peak, 4)
+
+    async def test_tiered_scoring_skips_model_for_clear_lines(self):
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request.content.decode())
+            return sentiment_response(request.content.decode())
+
+        # The last line is in the shadow sample: lexicon result, but also scored by the model
+        texts = ["I love it, amazing product!", "the parcel came on tuesday", "Great product, love it 0"]
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            results = await async_client.batch_analyze_sentiment_async(
+                texts, client=client, keyword_method="tfidf", escalation_threshold=0.85
+            )
+        self.assertEqual([r["tier"] for r in results], ["lexicon", "model", "lexicon"])
+        self.assertNotIn("shadow", results[0])
+        self.assertEqual(results[2]["shadow"][0]["label"], "negative")
+        self.assertEqual(len(requests_seen), 2)
+
+    async def test_cancel_event_aborts_in_flight_work(self):
+        cancel_event = threading.Event()
+
+        async def handler(request):
+            cancel_event.set()
+            await asyncio.sleep(10)
+            return sentiment_response("good")
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            results = await asyncio.wait_for(async_client.batch_analyze_sentiment_async(
+                ["a", "b", "c"], concurrency=2, client=client, cancel_event=cancel_event
+            ), timeout=5)
+        self.assertEqual([r["error"] for r in results], ["Analysis cancelled"] * 3)
+
+class TestSyncFacade(unittest.TestCase):
+    @patch("utils.async_client.batch_analyze_sentiment_async")
+    def test_run_batch_analyze_async(self, mock_batch):
+        async def fake_batch(texts, **kwargs):
+            return [{"text": t} for t in texts]
+        mock_batch.side_effect = fake_batch
+        self.assertEqual(async_client.run_batch_analyze_async(["x"]), [{"text": "x"}])
+
+if __name__ == "__main__":
+    unittest.main()
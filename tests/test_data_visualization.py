@@ -0,0 +1,54 @@
+import unittest
+import pandas as pd
+from components.data_visualization import (
+    build_distribution_bar,
+    build_sentiment_line_chart,
+    plot_sentiment_distribution_bar,
+    plot_sentiment_line_chart,
+    update_distribution_bar,
+    update_sentiment_trend
+)
+
+class TestFigureCache(unittest.TestCase):
+    def test_same_counts_share_one_figure(self):
+        counts = {"positive": 3, "neutral": 1, "negative": 2}
+        self.assertIs(plot_sentiment_distribution_bar(counts), plot_sentiment_distribution_bar(dict(counts)))
+        self.assertIsNot(
+            plot_sentiment_distribution_bar(counts),
+            plot_sentiment_distribution_bar({**counts, "negative": 5})
+        )
+
+    def test_line_chart_keyed_on_labels(self):
+        df = pd.DataFrame({"sentiment": ["Positive", "Negative"]})
+        fig = plot_sentiment_line_chart(df)
+        self.assertIs(fig, plot_sentiment_line_chart(df.copy()))
+        self.assertEqual(list(fig.data[0].y), ["Positive", "Negative"])
+        self.assertIsNot(fig, plot_sentiment_line_chart(pd.DataFrame({"sentiment": ["Negative", "Positive"]})))
+
+class TestLivePatching(unittest.TestCase):
+    def test_update_distribution_bar(self):
+        fig = build_distribution_bar({"positive": 0, "neutral": 0, "negative": 0})
+        update_distribution_bar(fig, {"positive": 2, "neutral": 1, "negative": 4})
+        self.assertEqual(list(fig.data[0].y), [2, 1, 4])
+
+    def test_update_sentiment_trend(self):
+        fig = build_sentiment_line_chart()
+        labels = ["Positive", "Neutral"]
+        update_sentiment_trend(fig, labels)
+        labels.append("Negative")
+        update_sentiment_trend(fig, labels)
+        self.assertEqual(list(fig.data[0].x), [1, 2, 3])
+        self.assertEqual(list(fig.data[0].y), ["Positive", "Neutral", "Negative"])
+
+    def test_live_trend_is_downsampled(self):
+        fig = build_sentiment_line_chart()
+        labels = ["Positive", "Negative"] * 501
+        update_sentiment_trend(fig, labels, max_points=500)
+        x = list(fig.data[0].x)
+        self.assertLessEqual(len(x), 501)
+        self.assertEqual(x[:2], [1, 4])
+        self.assertEqual(x[-1], 1002)
+        self.assertEqual(fig.data[0].y[-1], "Negative")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import zipfile
+import unittest
+import fitz
+from utils.file_processing import expand_archives, extract_lines, extract_lines_from_files
+
+def make_pdf(pages):
+    pdf = fitz.open()
+    for content in pages:
+        page = pdf.new_page()
+        page.insert_text((72, 72), content)
+    data = pdf.tobytes()
+    pdf.close()
+    return data
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+class TestFileProcessing(unittest.TestCase):
+    def test_extract_lines_keeps_source_and_page(self):
+        lines = extract_lines("notes.txt", b"Great service\n\n  Slow delivery  \n")
+        self.assertEqual(lines, [
+            {"text": "Great service", "source": "notes.txt", "page": 1},
+            {"text": "Slow delivery", "source": "notes.txt", "page": 1},
+        ])
+
+    def test_extract_lines_pdf_pages(self):
+        lines = extract_lines("report.pdf", make_pdf(["First page", "Second page"]))
+        self.assertEqual([(l["text"], l["page"]) for l in lines], [("First page", 1), ("Second page", 2)])
+
+    def test_expand_archives_skips_unsupported_members(self):
+        archive = make_zip([("a.txt", b"one"), ("image.png", b"\x89PNG"), ("docs/b.txt", b"two")])
+        files = expand_archives([("batch.zip", archive), ("c.txt", b"three")])
+        self.assertEqual([name for name, _ in files], ["batch.zip/a.txt", "batch.zip/docs/b.txt", "c.txt"])
+
+    def test_extract_lines_from_files_preserves_order(self):
+        files = [
+            ("a.txt", b"alpha one\nalpha two"),
+            ("b.zip", make_zip([("b.txt", b"beta")])),
+            ("c.pdf", make_pdf(["gamma"])),
+        ]
+        lines, errors = extract_lines_from_files(files, max_workers=2)
+        self.assertEqual(errors, {})
+        self.assertEqual(
+            [(l["source"], l["text"]) for l in lines],
+            [("a.txt", "alpha one"), ("a.txt", "alpha two"), ("b.zip/b.txt", "beta"), ("c.pdf", "gamma")]
+        )
+
+    def test_extract_lines_from_files_isolates_bad_files(self):
+        files = [("good.txt", b"fine"), ("broken.pdf", b"not a pdf")]
+        lines, errors = extract_lines_from_files(files, max_workers=2)
+        self.assertEqual([l["text"] for l in lines], ["fine"])
+        self.assertIn("broken.pdf", errors)
+
+    def test_corrupt_archive_is_reported_not_raised(self):
+        files = [("good.txt", b"fine"), ("broken.zip", b"PK\x03\x04 truncated"), ("ok.zip", make_zip([("b.txt", b"beta")]))]
+        lines, errors = extract_lines_from_files(files, max_workers=2)
+        self.assertEqual([l["text"] for l in lines], ["fine", "beta"])
+        self.assertEqual(list(errors), ["broken.zip"])
+        with self.assertRaises(zipfile.BadZipFile):
+            expand_archives([("broken.zip", b"not a zip")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from utils.keyword_engine import build_term_document_matrix, extract_keywords_batch, tokenize_corpus
+from utils.text_processing import extract_keywords_simple
+
+class TestKeywordEngine(unittest.TestCase):
+    def test_tokenize_matches_simple_extractor_rules(self):
+        texts = ["Don't worry, the refund was QUICK!", "It is what it is"]
+        self.assertEqual(tokenize_corpus(texts), [["dont", "worry", "refund", "quick"], ["what"]])
+
+    def test_tokenize_keeps_multiline_texts_together(self):
+        self.assertEqual(len(tokenize_corpus(["first line\nsecond line", "other"])), 2)
+
+    def test_term_document_matrix(self):
+        indptr, indices, counts, vocabulary = build_term_document_matrix(["refund refund late", "", "late"])
+        self.assertEqual(vocabulary, ["refund", "late"])
+        self.assertEqual(indptr.tolist(), [0, 2, 2, 3])
+        self.assertEqual(indices.tolist(), [0, 1, 1])
+        self.assertEqual(counts.tolist(), [2, 1, 1])
+
+    def test_tfidf_downweights_common_terms(self):
+        texts = [
+            "product arrived broken",
+            "product works great",
+            "product support helpful",
+        ]
+        keywords = extract_keywords_batch(texts, top_n=2)
+        self.assertEqual(keywords, [["arrived", "broken"], ["works", "great"], ["support", "helpful"]])
+
+    def test_single_text_matches_frequency_ranking(self):
+        text = "battery battery screen screen screen camera"
+        self.assertEqual(extract_keywords_batch([text], top_n=3)[0], extract_keywords_simple(text, 3))
+
+    def test_handles_empty_and_stopword_only_texts(self):
+        self.assertEqual(extract_keywords_batch([]), [])
+        self.assertEqual(extract_keywords_batch(["", "it is the"]), [[], []])
+        self.assertEqual(extract_keywords_batch(["", "refund please"]), [[], ["refund", "please"]])
+
+    def test_custom_stop_words(self):
+        self.assertEqual(extract_keywords_batch(["el producto es muy bueno"], stop_words={"muy"}), [["producto", "bueno"]])
+
+if __name__ == "__main__":
+    unittest.main()
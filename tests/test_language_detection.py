@@ -0,0 +1,36 @@
+import unittest
+from utils.language_detection import detect_language, group_by_language
+
+class TestLanguageDetection(unittest.TestCase):
+    def test_latin_script_languages(self):
+        samples = {
+            "en": "The delivery was fast and the staff were friendly",
+            "es": "El envío fue muy rápido y el producto es excelente",
+            "fr": "Le produit est très bien mais la livraison était lente",
+            "de": "Das Produkt ist sehr gut, aber der Versand war langsam",
+            "it": "Il prodotto è molto buono ma la consegna è lenta",
+            "pt": "O produto é muito bom mas a entrega foi lenta",
+            "nl": "Het product is erg goed maar de levering was traag",
+        }
+        for language, text in samples.items():
+            self.assertEqual(detect_language(text), language, text)
+
+    def test_script_languages(self):
+        self.assertEqual(detect_language("Доставка была очень быстрой"), "ru")
+        self.assertEqual(detect_language("Доставка була дуже швидкою і їжа смачна"), "uk")
+        self.assertEqual(detect_language("配送がとても速かったです"), "ja")
+        self.assertEqual(detect_language("快递很快，产品很好"), "zh")
+        self.assertEqual(detect_language("배송이 빨랐어요"), "ko")
+        self.assertEqual(detect_language("التوصيل كان سريعا"), "ar")
+
+    def test_undecided_text_uses_default(self):
+        self.assertEqual(detect_language("Great!"), "en")
+        self.assertEqual(detect_language("12345"), "en")
+        self.assertEqual(detect_language("ok", default="de"), "de")
+
+    def test_group_by_language_keeps_input_order(self):
+        texts = ["I love it", "Es muy bueno", "It is broken", "No es lo que esperaba"]
+        self.assertEqual(group_by_language(texts), {"en": [0, 2], "es": [1, 3]})
+
+if __name__ == "__main__":
+    unittest.main()
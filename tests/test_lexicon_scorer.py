@@ -0,0 +1,66 @@
+import unittest
+from utils.lexicon_scorer import calibration_report, is_confident, score_lexicon
+
+def model_result(text, label, score):
+    return {"text": text, "sentiment": [{"label": label, "score": score}], "keywords": []}
+
+class TestLexiconScorer(unittest.TestCase):
+    def test_clear_positive_and_negative(self):
+        positive = score_lexicon("I love it, amazing product!")
+        negative = score_lexicon("Terrible service and very rude staff!")
+        self.assertEqual(positive[0]["label"], "positive")
+        self.assertEqual(negative[0]["label"], "negative")
+        self.assertTrue(is_confident(positive))
+        self.assertTrue(is_confident(negative))
+
+    def test_result_shape_matches_model(self):
+        result = score_lexicon("good value")
+        self.assertEqual({item["label"] for item in result}, {"positive", "neutral", "negative"})
+        self.assertEqual(result, sorted(result, key=lambda x: x["score"], reverse=True))
+        self.assertAlmostEqual(sum(item["score"] for item in result), 1.0)
+
+    def test_negation_flips_polarity(self):
+        self.assertEqual(score_lexicon("not good")[0]["label"], "negative")
+        self.assertEqual(score_lexicon("don't hate it")[0]["label"], "positive")
+
+    def test_no_opinion_words_is_neutral_and_escalates(self):
+        result = score_lexicon("The parcel arrived on Tuesday")
+        self.assertEqual(result[0]["label"], "neutral")
+        self.assertFalse(is_confident(result, threshold=0.5))
+
+    def test_mixed_text_has_low_confidence(self):
+        mixed = score_lexicon("The food was good but the service was terrible")
+        self.assertFalse(is_confident(mixed))
+        self.assertEqual(mixed[0]["label"], "negative")
+
+    def test_calibration_report(self):
+        results = [
+            model_result("I love it, amazing product!", "positive", 0.97),
+            model_result("Awful, the worst purchase ever", "negative", 0.95),
+            model_result("Best support team, great help", "negative", 0.70),
+            model_result("It arrived on Tuesday", "neutral", 0.80),
+            {"text": "lexicon line", "tier": "lexicon", "sentiment": [{"label": "positive", "score": 0.9}]},
+            {"text": "failed", "error": "boom"},
+        ]
+        report = {row["threshold"]: row for row in calibration_report(results, thresholds=(0.6, 0.99))}
+        self.assertEqual(report[0.6]["lines"], 4)
+        self.assertEqual(report[0.6]["handled_by_lexicon"], 3)
+        self.assertEqual(report[0.6]["model_calls_saved"], 75.0)
+        self.assertEqual(report[0.6]["agreement"], 66.67)
+        self.assertIsNone(report[0.99]["agreement"])
+
+    def test_calibration_report_weights_shadow_sample(self):
+        lexicon_line = {"text": "Great product, love it", "tier": "lexicon", "sentiment": [{"label": "positive", "score": 0.9}]}
+        results = [
+            model_result("It arrived on Tuesday", "neutral", 0.80),
+            dict(lexicon_line, shadow=[{"label": "negative", "score": 0.9}]),
+        ] + [lexicon_line] * 3
+        row = calibration_report(results, thresholds=(0.6,))[0]
+        self.assertEqual(row["lines"], 5)
+        self.assertEqual(row["shadow_lines"], 1)
+        self.assertEqual(row["handled_by_lexicon"], 4)
+        self.assertEqual(row["model_calls_saved"], 80.0)
+        self.assertEqual(row["agreement"], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from utils import api_client
+from utils.load_test import (
+    MockInferenceServer, max_sessions_within_slo, measure_baseline, session_lines, summarize_level
+)
+
+class TestMockInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockInferenceServer(latency=0.05, workers=2).start()
+        self.addCleanup(self.server.stop)
+
+    def test_answers_like_the_inference_api(self):
+        with patch.object(api_client, "API_URL", self.server.url):
+            first = api_client.analyze_sentiment("great service")
+            second = api_client.analyze_sentiment("great service")
+        self.assertEqual(first, second)
+        self.assertEqual({item["label"] for item in first}, {"positive", "neutral", "negative"})
+        self.assertAlmostEqual(sum(item["score"] for item in first), 1.0)
+        self.assertEqual(first, sorted(first, key=lambda x: x["score"], reverse=True))
+
+    def test_requests_queue_for_model_slots(self):
+        with patch.object(api_client, "API_URL", self.server.url), ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(api_client.analyze_sentiment, [f"line {i}" for i in range(6)]))
+        stats = self.server.stats()
+        self.assertEqual(stats["requests"], 6)
+        self.assertGreater(stats["peak_in_flight"], 2)
+        self.assertGreater(stats["mean_queue_ms"], 0)
+
+class TestCapacityCurve(unittest.TestCase):
+    def test_summarize_level(self):
+        sessions = [
+            {"session": i, "flow": "manual", "latency": latency, "analysis_seconds": latency - 1, "error": None}
+            for i, latency in enumerate([2.0, 4.0, 6.0, 8.0])
+        ]
+        sessions[3]["error"] = "boom"
+        row = summarize_level(sessions, wall_seconds=10.0, lines=5, baseline=2.0)
+        self.assertEqual(row["sessions"], 4)
+        self.assertEqual(row["p50_s"], 5.0)
+        self.assertEqual(row["max_s"], 8.0)
+        self.assertEqual(row["queue_delay_s"], 3.0)
+        self.assertEqual(row["errors"], 1)
+        self.assertEqual(row["sessions_per_min"], 18.0)
+        self.assertEqual(row["lines_per_s"], 1.5)
+
+    def test_baseline_is_mean_of_lone_sessions(self):
+        latencies = {"manual": 2.0, "upload": 4.0}
+        with patch("utils.load_test.run_session", side_effect=lambda session, flow, lines, app_path: {
+            "session": session, "flow": flow, "latency": latencies[flow]
+        }) as run_session:
+            self.assertEqual(measure_baseline("mixed", lines=5, runs=2), 3.0)
+            self.assertEqual([c.args[1] for c in run_session.call_args_list], ["manual", "upload"] * 2)
+            self.assertEqual(measure_baseline("upload", lines=5, runs=3), 4.0)
+
+    def test_max_sessions_within_slo(self):
+        curve = [
+            {"sessions": 1, "p95_s": 5.0, "errors": 0},
+            {"sessions": 4, "p95_s": 9.0, "errors": 0},
+            {"sessions": 8, "p95_s": 25.0, "errors": 0},
+            {"sessions": 16, "p95_s": 9.5, "errors": 2},
+        ]
+        self.assertEqual(max_sessions_within_slo(curve, 10.0), 4)
+        self.assertEqual(max_sessions_within_slo(curve, 1.0), 0)
+
+    def test_sessions_get_distinct_lines(self):
+        self.assertEqual(len(session_lines(0, 20)), 20)
+        self.assertFalse(set(session_lines(0, 5)) & set(session_lines(1, 5)))
+
+if __name__ == "__main__":
+    unittest.main()
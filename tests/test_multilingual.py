@@ -0,0 +1,68 @@
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from utils import multilingual
+
+class TestMultilingualRouting(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.barrier = threading.Barrier(2, timeout=5)
+
+        def fake_sentiment(text, controller=None, api_url=None):
+            self.calls.append((text, api_url))
+            if len(self.calls) <= 2:
+                # Only passes if both language groups are in flight at once
+                self.barrier.wait()
+            return [{"label": "positive", "score": 0.9}, {"label": "negative", "score": 0.1}]
+
+        patcher = patch("utils.api_client.analyze_sentiment", side_effect=fake_sentiment)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.texts = ["I love it, amazing product!", "El producto es muy bueno", "It is what it is", "La entrega fue lenta"]
+
+    def test_routes_groups_concurrently_and_merges_in_order(self):
+        with patch.dict(os.environ, {"HUGGINGFACE_API_URL_ES": "http://localhost/es"}):
+            results = multilingual.batch_analyze_multilingual(self.texts, metadata=[{"source": f"{i}.txt"} for i in range(4)])
+
+        self.assertEqual([r["text"] for r in results], self.texts)
+        self.assertEqual([r["language"] for r in results], ["en", "es", "en", "es"])
+        self.assertEqual([r["source"] for r in results], ["0.txt", "1.txt", "2.txt", "3.txt"])
+        urls = {text: url for text, url in self.calls}
+        self.assertEqual(urls["El producto es muy bueno"], "http://localhost/es")
+        self.assertEqual(urls["It is what it is"], multilingual.API_URL)
+
+    def test_other_languages_default_to_multilingual_model(self):
+        self.assertEqual(multilingual.get_language_api_url("de"), multilingual.MULTILINGUAL_API_URL)
+        self.assertEqual(multilingual.get_language_api_url("en"), multilingual.API_URL)
+
+    def test_tfidf_uses_each_languages_stop_words(self):
+        results = multilingual.batch_analyze_multilingual(self.texts, keyword_method="tfidf")
+        self.assertNotIn("muy", results[1]["keywords"])
+        self.assertIn("producto", results[1]["keywords"])
+
+    def test_tiered_scoring_only_for_english(self):
+        results = multilingual.batch_analyze_multilingual(self.texts, escalation_threshold=0.85)
+        self.assertEqual(results[0]["tier"], "lexicon")
+        self.assertNotIn("tier", results[1])
+        self.assertNotIn("I love it, amazing product!", [text for text, _ in self.calls])
+
+    def test_callbacks_run_on_calling_thread(self):
+        threads, progress = set(), []
+        multilingual.batch_analyze_multilingual(
+            self.texts,
+            result_callback=lambda result: threads.add(threading.get_ident()),
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+        self.assertEqual(threads, {threading.get_ident()})
+        self.assertEqual(progress[-1], (4, 4))
+
+    def test_keywords_use_language_extractor(self):
+        with patch("utils.api_client.extract_keywords", return_value=["k"]) as mock_keywords:
+            multilingual.batch_analyze_multilingual(self.texts)
+        languages = {c.args[0]: c.kwargs["language"] for c in mock_keywords.call_args_list}
+        self.assertEqual(languages["La entrega fue lenta"], "es")
+        self.assertEqual(languages["It is what it is"], "en")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import csv
+import json
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from utils import pipeline
+from export.export_csv import CsvStreamWriter
+from export.export_json import JsonlStreamWriter
+
+def fake_sentiment(text, controller=None, api_url=None):
+    if "good" in text:
+        return [{"label": "positive", "score": 0.9}, {"label": "negative", "score": 0.1}]
+    return [{"label": "negative", "score": 0.9}, {"label": "positive", "score": 0.1}]
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = patch("utils.api_client.analyze_sentiment", side_effect=fake_sentiment)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_normalize_collapses_whitespace_and_dedups(self):
+        lines = ["  good   day ", "", "good day", {"text": "bad\tday", "source": "a.txt"}, "good day"]
+        self.assertEqual(list(pipeline.normalize_stream(lines)), [
+            {"text": "good day"},
+            {"text": "bad day", "source": "a.txt"},
+        ])
+
+    def test_dedup_window_is_bounded(self):
+        lines = ["a", "b", "c", "a"]
+        self.assertEqual([l["text"] for l in pipeline.normalize_stream(lines, dedup_window=2)], ["a", "b", "c", "a"])
+
+    def test_zero_dedup_window_keeps_repeats(self):
+        lines = ["OK", " OK ", "Thanks", "OK"]
+        self.assertEqual([l["text"] for l in pipeline.normalize_stream(lines, dedup_window=0)], ["OK", "OK", "Thanks", "OK"])
+
+    def test_pipeline_feeds_sinks_and_aggregate_in_order(self):
+        path = os.path.join(self.tmp_dir.name, "input.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("good service\nbad delivery\n\ngood service\ngood price\n")
+        csv_path = os.path.join(self.tmp_dir.name, "out.csv")
+        jsonl_path = os.path.join(self.tmp_dir.name, "out.jsonl")
+
+        aggregator = pipeline.run_pipeline(
+            pipeline.extract_stream([path]),
+            sinks=[CsvStreamWriter(csv_path), JsonlStreamWriter(jsonl_path)],
+            batch_size=2,
+            delay=0
+        )
+
+        self.assertEqual(aggregator.counts, {"positive": 2, "neutral": 0, "negative": 1})
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([r["text"] for r in rows], ["good service", "bad delivery", "good price"])
+        self.assertEqual(rows[0]["source"], path)
+        self.assertEqual(rows[1]["sentiment"], "Negative")
+        with open(jsonl_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[2]["text"], "good price")
+        self.assertEqual(records[2]["page"], 1)
+
+    def test_backpressure_limits_read_ahead(self):
+        produced = 0
+        release = threading.Event()
+
+        def source():
+            nonlocal produced
+            for i in range(1000):
+                produced += 1
+                yield f"line {i}"
+
+        def slow_sink_write(result):
+            release.wait(timeout=5)
+
+        class SlowSink:
+            write = staticmethod(slow_sink_write)
+
+            def close(self):
+                pass
+
+        observed = []
+        def progress(n):
+            if n == 1:
+                threading.Timer(0.3, release.set).start()
+                observed.append(produced)
+
+        pipeline.run_pipeline(source(), sinks=[SlowSink()], queue_size=4, batch_size=2,
+                              progress_callback=progress, delay=0, keyword_method="tfidf")
+        # While the sink is stuck on the first result, extraction can only run
+        # ahead by the queues plus the batch being scored
+        self.assertLess(observed[0], 20)
+        self.assertEqual(produced, 1000)
+
+    def test_stage_errors_propagate(self):
+        def source():
+            yield "good"
+            raise RuntimeError("extraction failed")
+
+        with self.assertRaises(RuntimeError):
+            pipeline.run_pipeline(source(), delay=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from utils.rate_controller import AdaptiveRateController, BatchedRateController, get_rate_controller
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestAdaptiveRateController(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.controller = AdaptiveRateController(
+            initial_rate=2.0, min_rate=0.5, max_rate=4.0,
+            clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_rate_increases_on_success(self):
+        self.controller.record(0.2, 200)
+        self.assertGreater(self.controller.rate, 2.0)
+
+    def test_rate_never_exceeds_max(self):
+        for _ in range(200):
+            self.controller.record(0.2, 200)
+        self.assertEqual(self.controller.rate, 4.0)
+
+    def test_rate_halves_on_throttling(self):
+        self.controller.record(0.2, 429)
+        self.assertEqual(self.controller.rate, 1.0)
+
+    def test_back_off_keeps_queued_reservations(self):
+        controller = AdaptiveRateController(initial_rate=10.0, max_rate=10.0, clock=self.clock)
+        queued = [controller._reserve() for _ in range(10)]
+        self.assertAlmostEqual(queued[-1], 0.9)
+        controller.record(0.1, 429)
+        # New requests wait behind the ones already queued, at the lower rate
+        self.assertAlmostEqual(controller._reserve(), 1.0)
+        self.assertAlmostEqual(controller._reserve(), 1.2)
+
+    def test_batched_controller_reserves_once_per_batch(self):
+        controller = AdaptiveRateController(initial_rate=10.0, max_rate=10.0, clock=self.clock)
+        calls = []
+
+        def reserve(count, samples=()):
+            calls.append((count, list(samples)))
+            return controller.reserve(count, samples)
+
+        worker = BatchedRateController(
+            type("Proxy", (), {"reserve": staticmethod(reserve)})(),
+            batch_size=4, clock=self.clock, sleep=self.clock.sleep
+        )
+        for _ in range(5):
+            worker.acquire()
+            worker.record(0.05, 200)
+        worker.flush()
+        self.assertEqual([count for count, _ in calls], [4, 4, 0])
+        self.assertEqual([len(samples) for _, samples in calls], [0, 4, 1])
+        self.assertAlmostEqual(self.clock.now, 0.4)
+
+    def test_batched_controller_rereserves_after_throttling(self):
+        controller = AdaptiveRateController(initial_rate=10.0, max_rate=10.0, clock=self.clock)
+        worker = BatchedRateController(controller, batch_size=4, clock=self.clock, sleep=self.clock.sleep)
+        worker.acquire()
+        worker.record(0.05, 429)
+        worker.acquire()
+        self.assertEqual(controller.rate, 5.0)
+
+    def test_backs_off_once_per_round_trip(self):
+        self.controller.record(0.5, 200)
+        rate = self.controller.rate
+        self.controller.record(0.5, 429)
+        self.controller.record(0.5, 429)
+        self.assertEqual(self.controller.rate, rate * 0.5)
+
+    def test_rate_never_below_min(self):
+        for _ in range(20):
+            self.clock.now += 10
+            self.controller.record(0.2, 429)
+        self.assertEqual(self.controller.rate, 0.5)
+
+    def test_rising_latency_backs_off(self):
+        self.controller.record(0.2, 200)
+        rate = self.controller.rate
+        self.clock.now += 1
+        self.controller.record(1.0, 200)
+        self.assertLess(self.controller.rate, rate)
+
+    def test_acquire_paces_requests(self):
+        for _ in range(3):
+            self.controller.acquire()
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+    def test_estimate_uses_measured_throughput(self):
+        self.assertAlmostEqual(self.controller.estimate_seconds(10), 5.0)
+        for _ in range(5):
+            self.clock.now += 1.0
+            self.controller.record(0.1, 200)
+        self.assertAlmostEqual(self.controller.estimate_seconds(10), 10.0)
+
+    def test_estimate_ignores_idle_time_between_runs(self):
+        for _ in range(10):
+            self.clock.now += 0.5
+            self.controller.record(0.1, 200)
+        before = self.controller.estimate_seconds(100)
+        self.clock.now += 3600
+        for _ in range(10):
+            self.clock.now += 0.5
+            self.controller.record(0.1, 200)
+        self.assertAlmostEqual(before, 50.0)
+        self.assertAlmostEqual(self.controller.estimate_seconds(100), 50.0)
+
+    def test_shared_controller_per_key(self):
+        self.assertIs(get_rate_controller("shared-test"), get_rate_controller("shared-test"))
+        self.assertIsNot(get_rate_controller("shared-test"), get_rate_controller("other-test"))
+
+if __name__ == "__main__":
+    unittest.main()
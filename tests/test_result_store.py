@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from utils.result_store import ResultStore
+
+def make_result(text, label, score, keywords=(), **extra):
+    result = {"text": text, "sentiment": [{"label": label, "score": score}], "keywords": list(keywords)}
+    result.update(extra)
+    return result
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ResultStore(os.path.join(self.tmp_dir.name, "results.db"))
+        self.store.add_results([
+            make_result("Still waiting for my refund", "negative", 0.92, ["refund"], source="mail.txt", page=1),
+            make_result("Refund arrived quickly, thanks", "positive", 0.88, ["refund", "thanks"]),
+            make_result("Delivery was slow", "negative", 0.55, ["delivery"]),
+            {"text": "Broken line", "error": "boom"},
+        ], analyzed_at=1000)
+        self.store.add_results([
+            make_result("Another refund problem", "negative", 0.81, ["problem"]),
+        ], analyzed_at=2000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_full_text_search_with_sentiment_filter(self):
+        rows = self.store.search(query="refund", sentiments=["Negative"])
+        self.assertEqual([r["text"] for r in rows], ["Another refund problem", "Still waiting for my refund"])
+
+    def test_search_matches_keywords(self):
+        rows = self.store.search(query="thanks")
+        self.assertEqual([r["text"] for r in rows], ["Refund arrived quickly, thanks"])
+
+    def test_time_and_confidence_filters(self):
+        self.assertEqual(len(self.store.search(since=1500)), 1)
+        self.assertEqual(len(self.store.search(until=1500)), 4)
+        rows = self.store.search(min_confidence=0.85)
+        self.assertEqual({r["text"] for r in rows}, {"Still waiting for my refund", "Refund arrived quickly, thanks"})
+
+    def test_low_confidence_stored_as_neutral(self):
+        self.assertEqual(self.store.summarize(), {"negative": 2, "positive": 1, "neutral": 1, "error": 1})
+
+    def test_rows_keep_source_and_round_trip(self):
+        row = self.store.search(source="mail")[0]
+        self.assertEqual(row["source"], "mail.txt")
+        self.assertEqual(row["page"], 1)
+        self.assertEqual(row["sentiment"], [{"label": "negative", "score": 0.92}])
+        self.assertEqual(row["keywords"], ["refund"])
+        self.assertEqual(row["analyzed_at"], 1000)
+
+    def test_delete_source_covers_archive_members(self):
+        self.store.add_results([
+            make_result("a", "positive", 0.9, source="in/a.zip/x.txt"),
+            make_result("b", "positive", 0.9, source="in/a.zip/sub/y.txt"),
+            make_result("c", "positive", 0.9, source="in/a.zip.bak"),
+            make_result("d", "positive", 0.9, source="in/a.zip0"),
+        ])
+        self.assertEqual(self.store.delete_source("in/a.zip"), 2)
+        self.assertEqual(len(self.store.search(source="in/a.zip")), 2)
+        self.assertEqual(self.store.delete_source("mail.txt"), 1)
+
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(self.store.search(query='refund" OR (*'), [])
+
+    def test_rollup_counts_match_row_counts(self):
+        self.store.add_results([make_result("Late", "positive", 0.9)], analyzed_at=2700)
+        for since, until in [(None, None), (900, 1800), (950, 2699), (999, 1001), (0, 2701), (1001, None)]:
+            filters = {"since": since, "until": until, "sentiments": ["Negative", "Positive"]}
+            expected = {}
+            for row in self.store.search(limit=100, **filters):
+                label = row["sentiment"][0]["label"]
+                expected[label] = expected.get(label, 0) + 1
+            self.assertEqual(self.store.summarize(**filters), expected, (since, until))
+
+    def test_existing_store_is_backfilled(self):
+        path = self.store.path
+        with sqlite3.connect(path) as conn:
+            conn.execute("DELETE FROM result_counts")
+            conn.execute("DELETE FROM sources")
+        store = ResultStore(path)
+        self.assertEqual(store.summarize(since=0), {"negative": 2, "positive": 1, "neutral": 1, "error": 1})
+        self.assertEqual(len(store.search(source="mail")), 1)
+
+    def test_version_changes_when_results_are_added_or_deleted(self):
+        version = self.store.version()
+        self.store.add_results([make_result("More", "positive", 0.9, source="new.txt")])
+        added = self.store.version()
+        self.assertNotEqual(added, version)
+        # Deleting the newest rows frees their ids for reuse; the version must still change
+        self.store.delete_source("new.txt")
+        self.store.add_results([make_result("Other", "negative", 0.9, source="new.txt")])
+        self.assertNotIn(self.store.version(), (version, added))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+from utils import sharding
+from utils.api_client import LABEL_MAP
+from utils.load_test import MockInferenceServer, mock_prediction
+from utils.rate_controller import get_rate_controller
+
+def fake_sentiment(text, controller=None, api_url=None):
+    if text == "api error":
+        return {"error": "API error 500: boom"}
+    if text == "explode":
+        raise RuntimeError("worker blew up")
+    score = 0.9 if "good" in text else 0.2
+    return [{"label": "positive", "score": score}, {"label": "negative", "score": 1 - score}]
+
+class TestSharding(unittest.TestCase):
+    @patch("utils.sharding.extract_keywords", return_value=["kw"])
+    @patch("utils.api_client.analyze_sentiment", side_effect=fake_sentiment)
+    def test_score_shard_returns_compact_chunk(self, mock_sentiment, mock_keywords):
+        chunk = sharding._score_shard(["good day", "api error", "explode"])
+        self.assertEqual(chunk["sentiments"][0], (("positive", 0.9), ("negative", 0.09999999999999998)))
+        self.assertEqual(chunk["sentiments"][1], "API error 500: boom")
+        self.assertEqual(chunk["failures"], {2: "worker blew up"})
+
+        results = sharding._unpack_shard(["good day", "api error", "explode"], chunk, None)
+        self.assertEqual(results[0]["sentiment"][0], {"label": "positive", "score": 0.9})
+        self.assertEqual(results[0]["keywords"], ["kw"])
+        self.assertEqual(results[1]["sentiment"], {"error": "API error 500: boom"})
+        self.assertEqual(results[2], {"text": "explode", "error": "worker blew up"})
+
+class TestShardedBatch(unittest.TestCase):
+    """
+    Workers are separate (forkserver/spawn) processes, so patches don't reach
+    them; they score against a local mock inference endpoint instead.
+    """
+
+    def setUp(self):
+        self.server = MockInferenceServer(latency=0.0, workers=8).start()
+        self.addCleanup(self.server.stop)
+        # Start the shared controller fast; pacing itself is covered in test_rate_controller
+        get_rate_controller(self.server.url, initial_rate=200.0, max_rate=200.0)
+
+    def test_sharded_batch_keeps_input_order(self):
+        texts = [f"good {i}" if i % 2 else f"bad {i}" for i in range(23)]
+        progress = []
+        results = sharding.sharded_batch_analyze(
+            texts, workers=3, shard_size=4,
+            progress_callback=lambda done, total: progress.append(done),
+            metadata=[{"source": f"doc{i}"} for i in range(23)],
+            api_url=self.server.url
+        )
+        self.assertEqual([r["text"] for r in results], texts)
+        self.assertEqual([r["source"] for r in results], [f"doc{i}" for i in range(23)])
+        self.assertEqual(progress[-1], 23)
+        self.assertEqual(len(progress), 6)
+        expected = [LABEL_MAP[item["label"]] for item in mock_prediction("good 1")]
+        self.assertIn(results[1]["sentiment"][0]["label"], expected)
+        self.assertEqual(self.server.stats()["requests"], 23)
+
+    def test_sharded_batch_tfidf_keywords_cover_whole_batch(self):
+        texts = ["good refund", "bad refund", "good delivery"]
+        results = sharding.sharded_batch_analyze(
+            texts, workers=2, shard_size=1, keyword_method="tfidf", api_url=self.server.url
+        )
+        self.assertEqual(results[2]["keywords"], ["delivery", "good"])
+
+    def test_sharded_batch_tiered_scoring(self):
+        texts = ["I love it, amazing product!", "good 1", "ok then"]
+        results = sharding.sharded_batch_analyze(
+            texts, workers=2, shard_size=2, keyword_method="tfidf", escalation_threshold=0.85,
+            api_url=self.server.url
+        )
+        self.assertEqual([r["tier"] for r in results], ["lexicon", "model", "model"])
+        self.assertEqual(self.server.stats()["requests"], 2)
+
+    def test_sharded_batch_shadow_scores_sampled_lexicon_lines(self):
+        results = sharding.sharded_batch_analyze(
+            ["Great product, love it 0"], workers=1, escalation_threshold=0.85, api_url=self.server.url
+        )
+        self.assertEqual(results[0]["tier"], "lexicon")
+        self.assertEqual(results[0]["shadow"][0]["label"], "positive")
+        self.assertEqual(self.server.stats()["requests"], 1)
+
+    def test_workers_share_the_parent_rate_controller(self):
+        controller = get_rate_controller(self.server.url)
+        texts = [f"line {i}" for i in range(12)]
+        with patch.object(controller, "reserve", wraps=controller.reserve) as reserve, \
+                patch.object(controller, "record", wraps=controller.record) as record:
+            sharding.sharded_batch_analyze(
+                texts, workers=2, shard_size=6, keyword_method="tfidf", api_url=self.server.url
+            )
+        # One round trip reserves a batch of slots; results come back with the next one
+        self.assertEqual(sum(c.args[0] for c in reserve.call_args_list if c.args[0]), 16)
+        self.assertLessEqual(reserve.call_count, 6)
+        self.assertEqual([c.args[1] for c in record.call_args_list], [200] * 12)
+
+    def test_max_rate_is_configurable(self):
+        sharding.sharded_batch_analyze(["line"], workers=1, api_url=self.server.url, max_rate=500.0)
+        self.assertEqual(get_rate_controller(self.server.url).max_rate, 500.0)
+
+if __name__ == "__main__":
+    unittest.main()
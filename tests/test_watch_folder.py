@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+from utils.result_store import ResultStore
+from utils.watch_folder import IngestState, scan_once
+
+def fake_sentiment(text, controller=None, api_url=None):
+    if "good" in text:
+        return [{"label": "positive", "score": 0.9}, {"label": "negative", "score": 0.1}]
+    return [{"label": "negative", "score": 0.9}, {"label": "positive", "score": 0.1}]
+
+class TestWatchFolder(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.folder = os.path.join(self.tmp_dir.name, "inbox")
+        os.makedirs(self.folder)
+        self.store = ResultStore(os.path.join(self.tmp_dir.name, "results.db"))
+        patcher = patch("utils.api_client.analyze_sentiment", side_effect=fake_sentiment)
+        self.analyze = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, name, content, mode="w"):
+        path = os.path.join(self.folder, name)
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(content)
+        # Make sure the change is visible even on coarse mtime resolution
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        return path
+
+    def scan(self):
+        return scan_once(self.folder, IngestState(self.store.path), self.store, delay=0)
+
+    def test_only_new_content_is_scored(self):
+        path = self.write("a.txt", "good service\nbad delivery\n")
+        self.write("notes.md", "ignored\n")
+        summary = self.scan()
+        self.assertEqual((summary["files_ingested"], summary["lines_scored"]), (1, 2))
+
+        self.analyze.reset_mock()
+        summary = self.scan()
+        self.assertEqual((summary["files_ingested"], summary["lines_scored"]), (0, 0))
+        self.analyze.assert_not_called()
+
+        self.write("a.txt", "good price\n", mode="a")
+        summary = self.scan()
+        self.assertEqual(summary["lines_scored"], 1)
+        self.assertEqual([c.args[0] for c in self.analyze.call_args_list], ["good price"])
+        self.assertEqual(self.store.summarize(source=path), {"positive": 2, "negative": 1})
+
+    def test_repeated_lines_are_all_counted(self):
+        path = self.write("a.txt", "good\ngood\nbad\ngood\n")
+        summary = self.scan()
+        self.assertEqual(summary["lines_scored"], 4)
+        self.assertEqual(self.store.summarize(source=path), {"positive": 3, "negative": 1})
+        self.assertEqual(summary["aggregator"].total, 4)
+
+    def test_running_aggregate_is_persisted(self):
+        self.write("a.txt", "good service\n")
+        self.scan()
+        self.write("b.txt", "bad delivery\n")
+        summary = self.scan()
+        self.assertEqual(summary["aggregator"].counts, {"positive": 1, "neutral": 0, "negative": 1})
+        self.assertEqual(IngestState(self.store.path).load_aggregate(self.folder).total, 2)
+
+    def test_touched_but_identical_file_is_skipped(self):
+        path = self.write("a.txt", "good service\n")
+        self.scan()
+        self.write("a.txt", "good service\n")
+        self.analyze.reset_mock()
+        self.assertEqual(self.scan()["files_ingested"], 0)
+        self.analyze.assert_not_called()
+        self.assertEqual(self.store.summarize(source=path), {"positive": 1})
+
+    def test_rewritten_file_starts_over(self):
+        path = self.write("a.txt", "good service\nbad delivery\n")
+        self.scan()
+        self.write("a.txt", "bad service\nbad delivery\ngood price\n")
+        summary = self.scan()
+        self.assertEqual(summary["lines_scored"], 3)
+        # The earlier version's rows and counts are replaced, not kept alongside
+        self.assertEqual(self.store.summarize(source=path), {"positive": 1, "negative": 2})
+        self.assertEqual(summary["aggregator"].counts, {"positive": 1, "neutral": 0, "negative": 2})
+        self.assertEqual(IngestState(self.store.path).load_aggregate(self.folder).total, 3)
+
+        # Archive members are stored as "a.zip/member.txt"; a rewrite replaces them too
+        archive = os.path.join(self.folder, "a.zip")
+        for lines in (["good service", "good price"], ["bad service", "bad price"]):
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("notes.txt", "\n".join(lines))
+            stat = os.stat(archive)
+            os.utime(archive, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+            summary = self.scan()
+        self.assertEqual(self.store.summarize(source="a.zip"), {"negative": 2})
+        self.assertEqual(summary["aggregator"].counts, {"positive": 1, "neutral": 0, "negative": 4})
+
+    def test_failed_line_is_retried_on_next_scan(self):
+        path = self.write("a.txt", "good service\nflaky line\nbad delivery\n")
+        fail = {"flaky line"}
+        self.analyze.side_effect = lambda text, **kwargs: (
+            {"error": "API error 503"} if text in fail else fake_sentiment(text)
+        )
+        summary = self.scan()
+        self.assertIn("Line 2 failed", summary["errors"][path])
+        self.assertEqual(self.store.summarize(source=path), {"positive": 1})
+        self.assertEqual(IngestState(self.store.path).get_file(path)["lines_done"], 1)
+
+        fail.clear()
+        self.analyze.reset_mock()
+        summary = self.scan()
+        self.assertEqual(summary["lines_scored"], 2)
+        self.assertEqual([c.args[0] for c in self.analyze.call_args_list], ["flaky line", "bad delivery"])
+        self.assertEqual(self.store.summarize(source=path), {"positive": 1, "negative": 2})
+        self.assertEqual(summary["aggregator"].total, 3)
+
+    def test_failed_file_commits_nothing(self):
+        path = self.write("a.txt", "good service\nbad delivery\n")
+        with patch("utils.pipeline.batch_analyze_sentiment_with_keywords", side_effect=RuntimeError("boom")):
+            summary = self.scan()
+        self.assertIn(path, summary["errors"])
+        self.assertEqual(self.store.summarize(source=path), {})
+        self.assertIsNone(IngestState(self.store.path).get_file(path))
+
+        self.assertEqual(self.scan()["lines_scored"], 2)
+        self.assertEqual(self.store.summarize(source=path), {"positive": 1, "negative": 1})
+
+    def test_deleted_file_is_forgotten(self):
+        path = self.write("a.txt", "good service\n")
+        self.scan()
+        os.remove(path)
+        self.scan()
+        self.assertIsNone(IngestState(self.store.path).get_file(path))
+
+if __name__ == "__main__":
+    unittest.main()
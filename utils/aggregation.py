@@ -0,0 +1,182 @@
+SENTIMENT_LABELS = ("positive", "neutral", "negative")
+NEUTRAL_THRESHOLD = 0.6
+HISTOGRAM_BINS = 10
+
+
+def get_sentiment_label(result):
+    """
+    Resolve the dashboard label for a single analysis result.
+    Low-confidence predictions count as neutral and failed rows count as neutral;
+    returns (label, confidence) or (None, None) when the row isn't counted.
+    """
+    if "sentiment" in result and isinstance(result["sentiment"], list):
+        top = result["sentiment"][0]
+        label = "neutral" if top["score"] < NEUTRAL_THRESHOLD else top["label"]
+        return label, top["score"]
+    elif "error" in result:
+        return "neutral", None
+    return None, None
+
+
+class MisraGries:
+    """
+    Misra-Gries heavy hitters sketch.
+    Keeps at most `capacity` counters; any item occurring more than
+    n / (capacity + 1) times is guaranteed to be kept, and counts are
+    underestimated by at most that much.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counters = {}
+
+    def add(self, item, count=1):
+        if item in self.counters or len(self.counters) < self.capacity:
+            self.counters[item] = self.counters.get(item, 0) + count
+            return
+
+        # Table full: decrement everything, dropping counters that reach zero
+        decrement = min(count, min(self.counters.values()))
+        self.counters = {k: v - decrement for k, v in self.counters.items() if v > decrement}
+        if count > decrement:
+            self.add(item, count - decrement)
+
+    def merge(self, other):
+        for item, count in other.counters.items():
+            self.counters[item] = self.counters.get(item, 0) + count
+        if len(self.counters) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count to restore the bound
+            cutoff = sorted(self.counters.values(), reverse=True)[self.capacity]
+            self.counters = {k: v - cutoff for k, v in self.counters.items() if v > cutoff}
+        return self
+
+    def subtract(self, other):
+        """Remove counts merged in earlier; counters that drop to zero are discarded"""
+        for item, count in other.counters.items():
+            if item in self.counters:
+                self.counters[item] -= count
+        self.counters = {k: v for k, v in self.counters.items() if v > 0}
+        return self
+
+    def top(self, n=10):
+        return sorted(self.counters.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+
+    def to_dict(self):
+        return {"capacity": self.capacity, "counters": dict(self.counters)}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state["capacity"])
+        sketch.counters = dict(state["counters"])
+        return sketch
+
+
+class SentimentAggregator:
+    """
+    Running sentiment statistics with O(1) add and mergeable partials.
+    Tracks label counts, confidence sums and a confidence histogram per label,
+    plus a Misra-Gries sketch of keyword counts per label.
+    """
+
+    def __init__(self, keyword_capacity=100):
+        self.keyword_capacity = keyword_capacity
+        self.counts = {label: 0 for label in SENTIMENT_LABELS}
+        self.total = 0
+        self.errors = 0
+        self.confidence_sums = {label: 0.0 for label in SENTIMENT_LABELS}
+        self.confidence_counts = {label: 0 for label in SENTIMENT_LABELS}
+        self.histograms = {label: [0] * HISTOGRAM_BINS for label in SENTIMENT_LABELS}
+        self.keywords = {label: MisraGries(keyword_capacity) for label in SENTIMENT_LABELS}
+
+    def add(self, result):
+        label, confidence = get_sentiment_label(result)
+        if label not in self.counts:
+            return self
+
+        self.counts[label] += 1
+        self.total += 1
+
+        if confidence is None:
+            self.errors += 1
+            return self
+
+        self.confidence_sums[label] += confidence
+        self.confidence_counts[label] += 1
+        self.histograms[label][min(int(confidence * HISTOGRAM_BINS), HISTOGRAM_BINS - 1)] += 1
+        for keyword in result.get("keywords", []):
+            self.keywords[label].add(keyword.lower())
+        return self
+
+    def update(self, results):
+        for result in results:
+            self.add(result)
+        return self
+
+    def merge(self, other):
+        """Fold another partial aggregate (e.g. from a parallel worker) into this one"""
+        self.total += other.total
+        self.errors += other.errors
+        for label in SENTIMENT_LABELS:
+            self.counts[label] += other.counts[label]
+            self.confidence_sums[label] += other.confidence_sums[label]
+            self.confidence_counts[label] += other.confidence_counts[label]
+            self.histograms[label] = [a + b for a, b in zip(self.histograms[label], other.histograms[label])]
+            self.keywords[label].merge(other.keywords[label])
+        return self
+
+    def subtract(self, other):
+        """
+        Remove a partial aggregate merged in earlier (e.g. for content that was
+        replaced). Counts are exact; keyword counts stay approximate as with merge.
+        """
+        self.total -= other.total
+        self.errors -= other.errors
+        for label in SENTIMENT_LABELS:
+            self.counts[label] -= other.counts[label]
+            self.confidence_sums[label] -= other.confidence_sums[label]
+            self.confidence_counts[label] -= other.confidence_counts[label]
+            self.histograms[label] = [a - b for a, b in zip(self.histograms[label], other.histograms[label])]
+            self.keywords[label].subtract(other.keywords[label])
+        return self
+
+    def distribution(self):
+        """Return (counts, percentages) in the same shape as compute_sentiment_distribution"""
+        counts = dict(self.counts)
+        if self.total == 0:
+            return counts, {}
+        percentages = {k: round((v / self.total) * 100, 2) for k, v in counts.items()}
+        return counts, percentages
+
+    def mean_confidence(self, label):
+        if self.confidence_counts[label] == 0:
+            return None
+        return self.confidence_sums[label] / self.confidence_counts[label]
+
+    def top_keywords(self, label, n=10):
+        return self.keywords[label].top(n)
+
+    def to_dict(self):
+        """JSON-serializable snapshot, e.g. to persist a running aggregate between runs"""
+        return {
+            "keyword_capacity": self.keyword_capacity,
+            "counts": dict(self.counts),
+            "total": self.total,
+            "errors": self.errors,
+            "confidence_sums": dict(self.confidence_sums),
+            "confidence_counts": dict(self.confidence_counts),
+            "histograms": {label: list(bins) for label, bins in self.histograms.items()},
+            "keywords": {label: sketch.to_dict() for label, sketch in self.keywords.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild an aggregator from to_dict output"""
+        aggregator = cls(state["keyword_capacity"])
+        aggregator.counts.update(state["counts"])
+        aggregator.total = state["total"]
+        aggregator.errors = state["errors"]
+        aggregator.confidence_sums.update(state["confidence_sums"])
+        aggregator.confidence_counts.update(state["confidence_counts"])
+        aggregator.histograms.update({label: list(bins) for label, bins in state["histograms"].items()})
+        aggregator.keywords.update({label: MisraGries.from_dict(sketch) for label, sketch in state["keywords"].items()})
+        return aggregator
@@ -1,13 +1,20 @@
 import os
 import requests
+import threading
 import time
 import streamlit as st
 from dotenv import load_dotenv
-from utils.text_processing import extract_keywords
+from utils.text_processing import extract_keywords, get_stop_words
+from utils.keyword_engine import extract_keywords_batch
+from utils.lexicon_scorer import in_shadow_sample, is_confident, score_lexicon
+from utils.rate_controller import get_rate_controller, THROTTLED_STATUS_CODES
 
 load_dotenv()  # Loads the .env file
 
-API_URL = "https://api-inference.huggingface.co/models/cardiffnlp/twitter-roberta-base-sentiment"
+API_URL = os.getenv(
+    "HUGGINGFACE_API_URL",
+    "https://api-inference.huggingface.co/models/cardiffnlp/twitter-roberta-base-sentiment"
+)
 HEADERS = {"Authorization": f"Bearer {os.getenv('HUGGINGFACE_API_KEY')}"}
 
 LABEL_MAP = {
@@ -16,18 +23,72 @@ LABEL_MAP = {
     "LABEL_2": "positive"
 }
 
-def analyze_sentiment(text):
-    """Analyze sentiment for a single text using HuggingFace API"""
+MAX_RETRIES = 3
+# Keep-alive connections per endpoint; enough for the threads of a busy server
+HTTP_POOL_SIZE = 32
+
+_adapters = {}
+_adapters_lock = threading.Lock()
+_local = threading.local()
+
+def _get_http_adapter(api_url):
+    """The process-wide connection pool for an endpoint, created on first use"""
+    with _adapters_lock:
+        if api_url not in _adapters:
+            _adapters[api_url] = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        return _adapters[api_url]
+
+def get_http_session(api_url=None):
+    """
+    Return this thread's requests.Session for an endpoint, creating it on
+    first use. requests.Session isn't thread-safe, so each thread gets its
+    own; all of them are mounted on one shared HTTPAdapter per endpoint, so
+    requests still reuse the same pool of keep-alive connections.
+    """
+    api_url = api_url or API_URL
+    sessions = getattr(_local, "sessions", None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+    if api_url not in sessions:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = _get_http_adapter(api_url)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        sessions[api_url] = session
+    return sessions[api_url]
+
+def analyze_sentiment(text, controller=None, api_url=None):
+    """
+    Analyze sentiment for a single text using HuggingFace API.
+    When an AdaptiveRateController is given, each request waits for a slot, reports
+    its latency and status back, and throttled requests are retried after backing off.
+    api_url selects another model endpoint (default: API_URL).
+    """
     payload = {"inputs": text}
+    session = get_http_session(api_url)
     
     try:
-        response = requests.post(API_URL, headers=HEADERS, json=payload)
+        for _ in range(MAX_RETRIES + 1 if controller else 1):
+            if controller:
+                controller.acquire()
+            start = time.monotonic()
+            try:
+                response = session.post(api_url or API_URL, json=payload)
+            except requests.exceptions.RequestException:
+                if controller:
+                    controller.record(time.monotonic() - start, None)
+                raise
+            if controller:
+                controller.record(time.monotonic() - start, response.status_code)
+            if response.status_code not in THROTTLED_STATUS_CODES:
+                break
         
         if response.status_code == 200:
             result = response.json()[0]
             # Replace label codes with meaningful labels
             for item in result:
-                item["label"] = LABEL_MAP.get(item["label"], item["label"])
+                item["label"] = LABEL_MAP.get(item["label"], item["label"].lower())
             return sorted(result, key=lambda x: x["score"], reverse=True)
         else:
             return {"error": f"API error {response.status_code}: {response.text}"}
@@ -37,33 +98,91 @@ def analyze_sentiment(text):
     except Exception as e:
         return {"error": f"Unexpected error: {str(e)}"}
 
-def batch_analyze_sentiment_with_keywords(text_list, delay=1, progress_callback=None):
-    """Analyze sentiment and extract keywords for a list of texts"""
+def score_text_tiered(text, controller=None, escalation_threshold=None, api_url=None):
+    """
+    Score a text, optionally through the cheap lexicon first.
+    With an escalation_threshold, clear-cut lexicon results are returned as-is
+    and only low-confidence or neutral lines go to the model.
+    Returns (sentiment_result, tier) where tier is "lexicon" or "model".
+    """
+    if escalation_threshold is not None:
+        lexicon_result = score_lexicon(text)
+        if is_confident(lexicon_result, escalation_threshold):
+            return lexicon_result, "lexicon"
+    return analyze_sentiment(text, controller=controller, api_url=api_url), "model"
+
+def shadow_score(text, tier, controller=None, api_url=None):
+    """
+    Also score a lexicon-handled line with the model if it is in the shadow
+    sample, for calibration_report. Returns the model result or None.
+    """
+    if tier != "lexicon" or not in_shadow_sample(text):
+        return None
+    result = analyze_sentiment(text, controller=controller, api_url=api_url)
+    return result if isinstance(result, list) else None
+
+KEYWORD_METHODS = ("yake", "tfidf")
+
+def batch_analyze_sentiment_with_keywords(text_list, delay=None, progress_callback=None, metadata=None,
+                                          result_callback=None, keyword_method="yake", escalation_threshold=None,
+                                          language="en", api_url=None):
+    """
+    Analyze sentiment and extract keywords for a list of texts.
+    Requests are paced by the process-wide adaptive rate controller; passing a
+    fixed delay (seconds) sleeps between calls instead.
+    metadata is an optional list, parallel to text_list, of dicts merged into each
+    result (e.g. the source file and page a line was extracted from).
+    result_callback, if given, is called with each result as soon as it is ready.
+    keyword_method is "yake" (per text) or "tfidf" (vectorized over the whole batch).
+    escalation_threshold enables two-tier scoring (see score_text_tiered); each
+    result then records the tier that scored it.
+    language selects the stop word list (YAKE and TF-IDF) and api_url the model endpoint
+    (default: API_URL), e.g. for a batch of lines in one language.
+    """
+    if keyword_method not in KEYWORD_METHODS:
+        raise ValueError(f"Unknown keyword method: {keyword_method}")
+
     results = []
+    controller = get_rate_controller(api_url or API_URL) if delay is None else None
+    batch_keywords = (
+        extract_keywords_batch(text_list, stop_words=get_stop_words(language)) if keyword_method == "tfidf" else None
+    )
     
     for i, text in enumerate(text_list):
+        tier = "model"
         try:
-            sentiment_result = analyze_sentiment(text)
-            keywords = extract_keywords(text)
+            sentiment_result, tier = score_text_tiered(text, controller, escalation_threshold, api_url)
+            keywords = batch_keywords[i] if batch_keywords is not None else extract_keywords(text, language=language)
             
-            results.append({
+            result = {
                 "text": text,
                 "sentiment": sentiment_result,
                 "keywords": keywords
-            })
+            }
+            if escalation_threshold is not None:
+                result["tier"] = tier
+                shadow = shadow_score(text, tier, controller, api_url)
+                if shadow:
+                    result["shadow"] = shadow
             
         except Exception as e:
-            results.append({
+            result = {
                 "text": text,
                 "error": str(e)
-            })
+            }
+        
+        if metadata:
+            result.update(metadata[i])
+        results.append(result)
+        if result_callback:
+            result_callback(result)
         
         # Update progress if callback provided
         if progress_callback:
             progress_callback(i + 1, len(text_list))
         
-        # Add delay between requests to avoid rate limiting
-        if i < len(text_list) - 1:  # Don't delay after the last request
+        # Add fixed delay between requests when not using the adaptive controller
+        if delay and (tier == "model" or "shadow" in result) and i < len(text_list) - 1:  # Don't delay after the last request
             time.sleep(delay)
     
     return results
\ No newline at end of file
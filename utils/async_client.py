@@ -0,0 +1,170 @@
+import time
+import asyncio
+import httpx
+from utils.api_client import API_URL, HEADERS, KEYWORD_METHODS, LABEL_MAP, MAX_RETRIES
+from utils.keyword_engine import extract_keywords_batch
+from utils.lexicon_scorer import in_shadow_sample, is_confident, score_lexicon
+from utils.rate_controller import get_rate_controller, THROTTLED_STATUS_CODES
+from utils.text_processing import extract_keywords
+
+try:
+    import h2  # noqa: F401 - only needed to enable HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_CONCURRENCY = 32
+
+
+def create_async_client(concurrency=DEFAULT_CONCURRENCY, timeout=30.0):
+    """
+    Create one pooled AsyncClient for a batch.
+    With HTTP/2 all requests are multiplexed over a handful of connections.
+    """
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        headers=HEADERS,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    )
+
+
+async def analyze_sentiment_async(text, client, controller=None):
+    """
+    Async variant of analyze_sentiment using a shared httpx.AsyncClient.
+    Returns the same sorted label list or {"error": ...} dict.
+    """
+    payload = {"inputs": text}
+
+    try:
+        for _ in range(MAX_RETRIES + 1 if controller else 1):
+            if controller:
+                await controller.acquire_async()
+            start = time.monotonic()
+            try:
+                response = await client.post(API_URL, json=payload)
+            except httpx.HTTPError:
+                if controller:
+                    controller.record(time.monotonic() - start, None)
+                raise
+            if controller:
+                controller.record(time.monotonic() - start, response.status_code)
+            if response.status_code not in THROTTLED_STATUS_CODES:
+                break
+
+        if response.status_code == 200:
+            result = response.json()[0]
+            # Replace label codes with meaningful labels
+            for item in result:
+                item["label"] = LABEL_MAP.get(item["label"], item["label"].lower())
+            return sorted(result, key=lambda x: x["score"], reverse=True)
+        else:
+            return {"error": f"API error {response.status_code}: {response.text}"}
+
+    except httpx.HTTPError as e:
+        return {"error": f"Request failed: {str(e)}"}
+    except Exception as e:
+        return {"error": f"Unexpected error: {str(e)}"}
+
+
+async def batch_analyze_sentiment_async(text_list, concurrency=DEFAULT_CONCURRENCY, progress_callback=None,
+                                        metadata=None, result_callback=None, keyword_method="yake",
+                                        cancel_event=None, client=None, escalation_threshold=None):
+    """
+    Analyze a batch with up to `concurrency` requests in flight on one connection pool.
+
+    Results come back in input order in the same shape as
+    batch_analyze_sentiment_with_keywords. Setting cancel_event (a
+    threading.Event) or cancelling the calling task aborts in-flight requests;
+    texts that never finished are returned as {"error": "Analysis cancelled"}.
+    escalation_threshold enables two-tier scoring: clear-cut lexicon results
+    skip the model entirely.
+    """
+    if keyword_method not in KEYWORD_METHODS:
+        raise ValueError(f"Unknown keyword method: {keyword_method}")
+
+    text_list = list(text_list)
+    controller = get_rate_controller(API_URL)
+    batch_keywords = extract_keywords_batch(text_list) if keyword_method == "tfidf" else None
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * len(text_list)
+    completed = 0
+
+    async def analyze_one(i, text, http_client):
+        nonlocal completed
+        async with semaphore:
+            try:
+                tier = "model"
+                sentiment_result = score_lexicon(text) if escalation_threshold is not None else None
+                if sentiment_result and is_confident(sentiment_result, escalation_threshold):
+                    tier = "lexicon"
+                else:
+                    sentiment_result = await analyze_sentiment_async(text, http_client, controller)
+                if batch_keywords is not None:
+                    keywords = batch_keywords[i]
+                else:
+                    # YAKE is CPU bound; keep it off the event loop
+                    keywords = await asyncio.to_thread(extract_keywords, text)
+                result = {"text": text, "sentiment": sentiment_result, "keywords": keywords}
+                if escalation_threshold is not None:
+                    result["tier"] = tier
+                    if tier == "lexicon" and in_shadow_sample(text):
+                        shadow = await analyze_sentiment_async(text, http_client, controller)
+                        if isinstance(shadow, list):
+                            result["shadow"] = shadow
+            except Exception as e:
+                result = {"text": text, "error": str(e)}
+
+        if metadata:
+            result.update(metadata[i])
+        results[i] = result
+        completed += 1
+        if result_callback:
+            result_callback(result)
+        if progress_callback:
+            progress_callback(completed, len(text_list))
+
+    async def watch_cancel_event(tasks):
+        while not cancel_event.is_set():
+            await asyncio.sleep(0.1)
+        for task in tasks:
+            task.cancel()
+
+    async def run(http_client):
+        tasks = [asyncio.create_task(analyze_one(i, text, http_client)) for i, text in enumerate(text_list)]
+        watcher = asyncio.create_task(watch_cancel_event(tasks)) if cancel_event else None
+        try:
+            # Callback exceptions (e.g. Streamlit stopping the script) propagate here
+            for task in asyncio.as_completed(tasks):
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if not (cancel_event and cancel_event.is_set()):
+                        raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            if watcher:
+                watcher.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    if client is not None:
+        await run(client)
+    else:
+        async with create_async_client(concurrency) as http_client:
+            await run(http_client)
+
+    for i, text in enumerate(text_list):
+        if results[i] is None:
+            results[i] = {"text": text, "error": "Analysis cancelled"}
+            if metadata:
+                results[i].update(metadata[i])
+    return results
+
+
+def run_batch_analyze_async(text_list, **kwargs):
+    """
+    Synchronous facade over batch_analyze_sentiment_async for Streamlit code.
+    Runs the batch on a fresh event loop and blocks until it finishes or is cancelled.
+    """
+    return asyncio.run(batch_analyze_sentiment_async(text_list, **kwargs))
@@ -0,0 +1,164 @@
+import os
+import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from utils.process_pool import get_process_context
+
+SUPPORTED_EXTENSIONS = ("txt", "pdf", "docx")
+
+
+def get_file_type(filename):
+    """Return the lower-case extension of a filename without the dot"""
+    return filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+
+def extract_pages(filename, data):
+    """Extract text from a TXT, PDF or DOCX file as a list of (page, content) tuples"""
+    file_type = get_file_type(filename)
+
+    if file_type == "txt":
+        return [(1, data.decode("utf-8"))]
+    elif file_type == "docx":
+        import docx2txt
+        return [(1, docx2txt.process(io.BytesIO(data)))]
+    elif file_type == "pdf":
+        import fitz
+        pages = []
+        pdf = fitz.open(stream=data, filetype="pdf")
+        for page_number, page in enumerate(pdf, start=1):
+            pages.append((page_number, page.get_text()))
+        pdf.close()
+        return pages
+
+    raise ValueError(f"Unsupported file type: {filename}")
+
+
+def extract_lines(filename, data):
+    """
+    Extract the non-empty lines of a single file.
+    Returns a list of dicts with the line text, its source file and page number.
+    """
+    lines = []
+    for page, content in extract_pages(filename, data):
+        for line in content.splitlines():
+            line = line.strip()
+            if line:
+                lines.append({"text": line, "source": filename, "page": page})
+    return lines
+
+
+def _archive_members(archive, prefix):
+    """
+    Yield ("prefix/member", bytes) for the supported, non-hidden files of an
+    open ZipFile, one member at a time
+    """
+    for member in archive.infolist():
+        if member.is_dir() or os.path.basename(member.filename).startswith("."):
+            continue
+        if get_file_type(member.filename) in SUPPORTED_EXTENSIONS:
+            yield f"{prefix}/{member.filename}", archive.read(member)
+
+
+def iter_file_lines(path):
+    """
+    Stream the non-empty lines of a file on disk without loading it whole.
+    TXT files are read line by line and PDFs page by page; DOCX files and ZIP
+    members are extracted one document at a time. Yields the same dicts as extract_lines.
+    """
+    file_type = get_file_type(path)
+
+    if file_type == "txt":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield {"text": line, "source": path, "page": 1}
+    elif file_type == "pdf":
+        import fitz
+        pdf = fitz.open(path)
+        try:
+            for page_number, page in enumerate(pdf, start=1):
+                for line in page.get_text().splitlines():
+                    line = line.strip()
+                    if line:
+                        yield {"text": line, "source": path, "page": page_number}
+        finally:
+            pdf.close()
+    elif file_type == "docx":
+        with open(path, "rb") as f:
+            yield from extract_lines(path, f.read())
+    elif file_type == "zip":
+        with zipfile.ZipFile(path) as archive:
+            for name, data in _archive_members(archive, path):
+                yield from extract_lines(name, data)
+    else:
+        raise ValueError(f"Unsupported file type: {path}")
+
+
+def _extract_lines_safe(filename, data):
+    """Process pool worker: never raises so one bad file can't sink the batch"""
+    try:
+        return extract_lines(filename, data), None
+    except Exception as e:
+        return [], str(e)
+
+
+def expand_archives(files, errors=None):
+    """
+    Expand ZIP archives into their supported members.
+    Takes a list of (filename, bytes) tuples and returns a new list where every
+    archive is replaced by the files it contains, named "archive.zip/member.txt".
+    When an errors dict is given, an unreadable archive is skipped and its error
+    recorded there instead of raised.
+    """
+    expanded = []
+    for filename, data in files:
+        if get_file_type(filename) != "zip":
+            expanded.append((filename, data))
+            continue
+
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                members = list(_archive_members(archive, filename))
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, EOFError) as e:
+            if errors is None:
+                raise
+            errors[filename] = str(e)
+            continue
+        expanded.extend(members)
+    return expanded
+
+
+def extract_lines_from_files(files, max_workers=None):
+    """
+    Extract lines from many files in parallel on a process pool.
+
+    Takes a list of (filename, bytes) tuples; ZIP archives are expanded first.
+    Returns (lines, errors): lines is a single list in upload order where every
+    entry keeps its source file and page, errors maps filename (or a corrupt
+    archive) to error message.
+    """
+    lines = []
+    errors = {}
+    files = expand_archives(files, errors)
+
+    if not files:
+        return lines, errors
+
+    if len(files) == 1:
+        outcomes = [_extract_lines_safe(*files[0])]
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(files))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_process_context()) as executor:
+            outcomes = list(executor.map(
+                _extract_lines_safe,
+                [filename for filename, _ in files],
+                [data for _, data in files]
+            ))
+
+    for (filename, _), (file_lines, error) in zip(files, outcomes):
+        if error:
+            errors[filename] = error
+        lines.extend(file_lines)
+
+    return lines, errors
@@ -0,0 +1,79 @@
+import numpy as np
+from itertools import chain
+from utils.text_processing import STOP_WORDS, PUNCTUATION_PATTERN
+
+
+def tokenize_corpus(texts, stop_words=STOP_WORDS):
+    """
+    Tokenize a whole corpus in one pass of the precompiled punctuation regex.
+    Uses the same rules as extract_keywords_simple: lower-case, punctuation
+    stripped, words of three or more characters that aren't in stop_words.
+    """
+    corpus = "\n".join(text.replace("\n", " ") for text in texts).lower()
+    documents = PUNCTUATION_PATTERN.sub("", corpus).split("\n")
+    return [
+        [word for word in document.split() if len(word) > 2 and word not in stop_words]
+        for document in documents
+    ]
+
+
+def build_term_document_matrix(texts, stop_words=STOP_WORDS):
+    """
+    Build a sparse document-term count matrix in CSR form.
+    Returns (indptr, indices, counts, vocabulary): row i's term ids are
+    indices[indptr[i]:indptr[i + 1]] with matching counts, and vocabulary maps
+    term id to term in first-seen order.
+    """
+    tokens = tokenize_corpus(texts, stop_words)
+    lengths = np.fromiter((len(doc) for doc in tokens), dtype=np.int64, count=len(tokens))
+
+    vocabulary = {}
+    term_ids = np.fromiter(
+        (vocabulary.setdefault(word, len(vocabulary)) for word in chain.from_iterable(tokens)),
+        dtype=np.int64,
+        count=int(lengths.sum())
+    )
+    doc_ids = np.repeat(np.arange(len(tokens), dtype=np.int64), lengths)
+
+    # Each (document, term) pair becomes one key; unique keys come back sorted
+    # by document then term, which is exactly CSR order
+    vocab_size = max(len(vocabulary), 1)
+    keys, counts = np.unique(doc_ids * vocab_size + term_ids, return_counts=True)
+    rows = keys // vocab_size
+    indices = keys % vocab_size
+    indptr = np.searchsorted(rows, np.arange(len(tokens) + 1))
+
+    return indptr, indices, counts, list(vocabulary)
+
+
+def extract_keywords_batch(texts, top_n=5, stop_words=STOP_WORDS):
+    """
+    Extract the top_n keywords of every text by TF-IDF over the whole batch.
+    Terms common across the corpus are down-weighted, so each document's
+    keywords are the words that distinguish it. Returns one list per text.
+    stop_words defaults to the English list; see get_stop_words for others.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    indptr, indices, counts, vocabulary = build_term_document_matrix(texts, stop_words)
+    if not vocabulary:
+        return [[] for _ in texts]
+
+    # Smoothed inverse document frequency, as in scikit-learn
+    n_docs = len(texts)
+    document_frequency = np.bincount(indices, minlength=len(vocabulary))
+    idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+    scores = counts * idf[indices]
+
+    # Sort every row by descending score (ties keep first-seen term order)
+    # and keep the first top_n entries of each row
+    rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+    order = np.lexsort((indices, -scores, rows))
+    rank = np.arange(len(order)) - indptr[rows[order]]
+    selected = order[rank < top_n]
+
+    terms = np.array(vocabulary, dtype=object)[indices[selected]]
+    boundaries = np.searchsorted(rows[selected], np.arange(1, n_docs))
+    return [chunk.tolist() for chunk in np.split(terms, boundaries)]
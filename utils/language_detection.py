@@ -0,0 +1,89 @@
+import re
+from collections import Counter
+
+DEFAULT_LANGUAGE = "en"
+
+# Non-Latin scripts that identify a language on their own. Kana comes
+# before the shared CJK ideographs so Japanese isn't read as Chinese.
+SCRIPTS = (
+    ("ja", re.compile(r"[\u3040-\u30ff]")),
+    ("ko", re.compile(r"[\uac00-\ud7af\u1100-\u11ff]")),
+    ("zh", re.compile(r"[\u4e00-\u9fff]")),
+    ("ar", re.compile(r"[\u0600-\u06ff]")),
+    ("he", re.compile(r"[\u0590-\u05ff]")),
+    ("el", re.compile(r"[\u0370-\u03ff]")),
+    ("ru", re.compile(r"[\u0400-\u04ff]")),
+    ("hi", re.compile(r"[\u0900-\u097f]")),
+    ("th", re.compile(r"[\u0e00-\u0e7f]")),
+)
+
+# Letters that tell apart languages sharing a script
+SCRIPT_VARIANTS = {
+    "ru": ("uk", re.compile(r"[\u0456\u0457\u0454\u0491\u0406\u0407\u0404\u0490]")),
+    "ar": ("fa", re.compile(r"[\u067e\u0686\u0698\u06af]")),
+}
+
+# The most frequent function words of each Latin-script language
+FUNCTION_WORDS = {
+    "en": {"the", "and", "is", "it", "was", "this", "that", "with", "for", "not", "you", "are", "of", "to",
+           "my", "but", "have", "very", "i", "they", "be", "on", "so", "at"},
+    "es": {"el", "la", "los", "las", "es", "y", "que", "de", "muy", "pero", "no", "con", "por", "para", "un",
+           "una", "está", "fue", "lo", "mi", "del", "al", "se", "su"},
+    "fr": {"le", "la", "les", "est", "et", "que", "de", "très", "mais", "pas", "avec", "pour", "un", "une",
+           "des", "du", "ce", "c'est", "je", "il", "elle", "mon", "au", "sur"},
+    "de": {"der", "die", "das", "ist", "und", "nicht", "sehr", "aber", "mit", "für", "ein", "eine", "ich",
+           "es", "war", "zu", "auf", "den", "dem", "sie", "wir", "mein", "auch", "nur"},
+    "it": {"il", "lo", "la", "gli", "le", "è", "e", "che", "di", "molto", "ma", "non", "con", "per", "un",
+           "una", "sono", "questo", "della", "del", "mi", "ho", "anche", "ci"},
+    "pt": {"o", "a", "os", "as", "é", "e", "que", "de", "muito", "mas", "não", "com", "por", "para", "um",
+           "uma", "foi", "do", "da", "meu", "isso", "eu", "no", "na"},
+    "nl": {"de", "het", "een", "is", "en", "niet", "zeer", "erg", "maar", "met", "voor", "ik", "dat", "van",
+           "was", "zijn", "op", "te", "heel", "mijn", "ook", "wel", "geen", "dit"},
+}
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+def detect_language(text, default=DEFAULT_LANGUAGE):
+    """
+    Guess the ISO 639-1 code of a short text.
+
+    Texts written mostly in a distinctive script (CJK, Cyrillic, Arabic, ...)
+    are identified by script; Latin-script texts by counting the function
+    words of each candidate language. Returns default when nothing matches,
+    e.g. for one-word lines or unsupported languages.
+    """
+    letters = sum(1 for ch in text if ch.isalpha())
+    if not letters:
+        return default
+
+    for language, pattern in SCRIPTS:
+        matches = len(pattern.findall(text))
+        if matches and (language == "ja" or matches * 2 >= letters):
+            variant = SCRIPT_VARIANTS.get(language)
+            if variant and variant[1].search(text):
+                return variant[0]
+            return language
+
+    words = WORD_PATTERN.findall(text.lower())
+    scores = Counter()
+    for word in words:
+        for language, function_words in FUNCTION_WORDS.items():
+            if word in function_words:
+                scores[language] += 1
+    if not scores:
+        return default
+
+    best = max(scores.values())
+    # Ties go to the default language, then to the order of FUNCTION_WORDS
+    if scores.get(default) == best:
+        return default
+    return next(language for language in FUNCTION_WORDS if scores.get(language) == best)
+
+
+def group_by_language(texts, default=DEFAULT_LANGUAGE):
+    """Map each detected language to the indices of its texts, in input order"""
+    groups = {}
+    for i, text in enumerate(texts):
+        groups.setdefault(detect_language(text, default), []).append(i)
+    return groups
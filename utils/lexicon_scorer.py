@@ -0,0 +1,183 @@
+import re
+import math
+import zlib
+from utils.aggregation import NEUTRAL_THRESHOLD, get_sentiment_label
+
+DEFAULT_ESCALATION_THRESHOLD = 0.85
+CALIBRATION_THRESHOLDS = (0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95)
+# Share of lexicon-handled lines also scored by the model, to keep calibration honest
+SHADOW_SAMPLE_RATE = 0.05
+
+# Valence of common opinion words, on VADER's -4..4 scale
+LEXICON = {
+    # positive
+    "good": 1.9, "great": 3.1, "excellent": 3.2, "amazing": 2.8, "awesome": 3.1, "fantastic": 2.6,
+    "wonderful": 2.7, "love": 3.2, "loved": 2.9, "loves": 2.7, "lovely": 2.8, "like": 1.5, "liked": 1.8,
+    "best": 3.2, "better": 1.9, "perfect": 2.7, "nice": 1.8, "happy": 2.7, "glad": 2.0, "pleased": 1.9,
+    "satisfied": 1.8, "recommend": 1.5, "recommended": 1.5, "helpful": 1.8, "friendly": 2.2,
+    "fast": 1.0, "quick": 1.0, "quickly": 1.0, "easy": 1.9, "reliable": 1.7, "beautiful": 2.9,
+    "impressive": 2.3, "impressed": 2.2, "enjoy": 2.2, "enjoyed": 2.3, "thanks": 1.9, "thank": 1.5,
+    "brilliant": 2.8, "superb": 3.1, "outstanding": 3.0, "delighted": 2.9, "smooth": 1.4,
+    "fun": 2.3, "cool": 1.3, "worth": 0.9, "solid": 1.2, "favorite": 2.0, "works": 0.9,
+    # negative
+    "bad": -2.5, "terrible": -2.1, "awful": -2.0, "horrible": -2.5, "worst": -3.1, "worse": -2.1,
+    "poor": -2.1, "hate": -2.7, "hated": -3.2, "disappointed": -1.9, "disappointing": -2.2,
+    "useless": -1.8, "broken": -1.7, "broke": -1.4, "slow": -1.0, "late": -1.0, "delayed": -1.1,
+    "rude": -2.0, "angry": -2.3, "annoying": -1.7, "annoyed": -1.6, "frustrating": -1.9,
+    "frustrated": -2.0, "problem": -1.7, "problems": -1.7, "issue": -1.0, "issues": -1.1,
+    "fail": -2.5, "failed": -2.3, "fails": -2.1, "failure": -2.3, "waste": -1.8, "wasted": -2.2,
+    "refund": -0.6, "scam": -2.7, "unhappy": -1.8, "sad": -2.1, "defective": -1.9, "damaged": -2.0,
+    "expensive": -0.9, "overpriced": -1.9, "cheap": -0.6, "buggy": -1.8, "crash": -1.7,
+    "crashes": -1.7, "unusable": -2.3, "complaint": -1.5, "wrong": -2.1, "sucks": -1.5,
+    "ugly": -2.3, "dirty": -1.9, "confusing": -1.3, "difficult": -1.5, "missing": -1.2,
+}
+
+BOOSTERS = {
+    "very": 0.293, "really": 0.293, "extremely": 0.293, "absolutely": 0.293, "so": 0.293,
+    "incredibly": 0.293, "totally": 0.293, "super": 0.293, "highly": 0.293, "most": 0.293,
+    "slightly": -0.293, "somewhat": -0.293, "barely": -0.293, "kind": -0.293, "little": -0.293,
+}
+
+NEGATIONS = {
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "cannot", "without",
+    "dont", "doesnt", "didnt", "isnt", "wasnt", "arent", "werent", "cant", "couldnt", "wont",
+    "wouldnt", "shouldnt", "hasnt", "havent", "hadnt", "aint",
+}
+
+NEGATION_SCALAR = -0.74
+TOKEN_PATTERN = re.compile(r"[A-Za-z']+|!")
+
+
+def _tokenize(text):
+    return [token.replace("'", "") for token in TOKEN_PATTERN.findall(text)]
+
+
+def lexicon_valence(text):
+    """
+    Return (compound, positive_sum, negative_sum) for a text using VADER-style
+    rules: boosters and dampeners, negation within three words, ALL CAPS
+    emphasis, exclamation marks and the "but" contrast shift.
+    """
+    tokens = _tokenize(text)
+    words = [t.lower() for t in tokens]
+    has_mixed_case = any(t.isupper() for t in tokens) and any(not t.isupper() for t in tokens if t != "!")
+    but_index = words.index("but") if "but" in words else None
+
+    valences = []
+    for i, word in enumerate(words):
+        valence = LEXICON.get(word)
+        if not valence:
+            continue
+
+        if has_mixed_case and tokens[i].isupper() and len(tokens[i]) > 1:
+            valence += 0.733 if valence > 0 else -0.733
+
+        for distance, previous in enumerate(reversed(words[max(0, i - 3):i]), start=1):
+            boost = BOOSTERS.get(previous)
+            if boost:
+                boost = boost if valence > 0 else -boost
+                valence += boost * (1.0 if distance == 1 else 0.95 if distance == 2 else 0.9)
+            if previous in NEGATIONS:
+                valence *= NEGATION_SCALAR
+
+        if but_index is not None:
+            valence *= 0.5 if i < but_index else 1.5 if i > but_index else 1.0
+        valences.append(valence)
+
+    total = sum(valences)
+    if total:
+        emphasis = min(words.count("!"), 4) * 0.292
+        total += emphasis if total > 0 else -emphasis
+
+    compound = total / math.sqrt(total * total + 15)
+    positive_sum = sum(v for v in valences if v > 0)
+    negative_sum = -sum(v for v in valences if v < 0)
+    return compound, positive_sum, negative_sum
+
+
+def score_lexicon(text):
+    """
+    Cheap first-pass scorer returning the same shape as analyze_sentiment:
+    a label/score list sorted by score. The top score is the lexicon's
+    confidence; it drops when the text mixes positive and negative words.
+    """
+    compound, positive_sum, negative_sum = lexicon_valence(text)
+    if compound == 0:
+        return [
+            {"label": "neutral", "score": 0.5},
+            {"label": "positive", "score": 0.25},
+            {"label": "negative", "score": 0.25},
+        ]
+
+    agreement = abs(positive_sum - negative_sum) / (positive_sum + negative_sum)
+    confidence = 0.5 + 0.5 * abs(compound) * agreement
+    label, opposite = ("positive", "negative") if compound > 0 else ("negative", "positive")
+    return [
+        {"label": label, "score": confidence},
+        {"label": "neutral", "score": (1 - confidence) * 0.75},
+        {"label": opposite, "score": (1 - confidence) * 0.25},
+    ]
+
+
+def is_confident(lexicon_result, threshold=DEFAULT_ESCALATION_THRESHOLD):
+    """Whether a lexicon result is clear-cut enough to skip the model"""
+    top = lexicon_result[0]
+    return top["label"] != "neutral" and top["score"] >= threshold
+
+
+def in_shadow_sample(text, rate=SHADOW_SAMPLE_RATE):
+    """
+    Whether a lexicon-handled line should also be scored by the model.
+    Picked by a hash of the text, so every execution mode samples the same lines.
+    """
+    return zlib.crc32(text.encode("utf-8")) % 10000 < rate * 10000
+
+
+def calibration_report(results, thresholds=CALIBRATION_THRESHOLDS):
+    """
+    Compare the lexicon against the model at each escalation threshold.
+
+    For every threshold returns the share of lines the lexicon would have
+    handled on its own and how often its dashboard label agreed with the
+    model's on those lines. Model-scored results are compared directly;
+    lexicon-handled results are represented by their shadow sample (the
+    "shadow" model result), weighted up to the number of lexicon lines, so
+    a tiered run isn't judged only on the lines the lexicon was unsure of.
+    shadow_lines is the size of that sample.
+    """
+    pairs, shadow_pairs, lexicon_lines = [], [], 0
+    for r in results:
+        if "error" in r:
+            continue
+        if r.get("tier", "model") == "model":
+            model_label, _ = get_sentiment_label(r)
+            if model_label is not None:
+                pairs.append((score_lexicon(r["text"])[0], model_label, 1.0))
+            continue
+        lexicon_lines += 1
+        if r.get("shadow"):
+            model_label, _ = get_sentiment_label({"sentiment": r["shadow"]})
+            shadow_pairs.append((score_lexicon(r["text"])[0], model_label))
+    if shadow_pairs:
+        weight = lexicon_lines / len(shadow_pairs)
+        pairs += [(top, model_label, weight) for top, model_label in shadow_pairs]
+    lines = sum(weight for _, _, weight in pairs)
+
+    report = []
+    for threshold in thresholds:
+        handled = [(top, model_label, weight) for top, model_label, weight in pairs
+                   if top["label"] != "neutral" and top["score"] >= threshold]
+        handled_lines = sum(weight for _, _, weight in handled)
+        agreed = sum(
+            weight for top, model_label, weight in handled
+            if (top["label"] if top["score"] >= NEUTRAL_THRESHOLD else "neutral") == model_label
+        )
+        report.append({
+            "threshold": threshold,
+            "lines": round(lines),
+            "shadow_lines": len(shadow_pairs),
+            "handled_by_lexicon": round(handled_lines),
+            "model_calls_saved": round(handled_lines / lines * 100, 2) if lines else 0.0,
+            "agreement": round(agreed / handled_lines * 100, 2) if handled else None,
+        })
+    return report
@@ -0,0 +1,392 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+DEFAULT_LEVELS = (1, 2, 4, 8)
+DEFAULT_LINES = 20
+DEFAULT_SLO_SECONDS = 30.0
+SESSION_TIMEOUT = 600
+BASELINE_RUNS = 2
+FLOWS = ("manual", "upload", "mixed")
+
+SAMPLE_LINES = [
+    "The delivery was fast and the support team was really helpful",
+    "Terrible experience, the product arrived broken and nobody answered",
+    "It does what it says on the box",
+    "Absolutely love the new dashboard, great work",
+    "The price went up again and the app keeps crashing",
+    "Order number 5512 was shipped on Monday",
+    "Not bad, but the checkout flow is confusing",
+    "Worst customer service I have ever dealt with",
+    "Setup took about ten minutes",
+    "Really impressed with how quickly the refund was processed",
+]
+
+
+class MockInferenceServer:
+    """
+    Local stand-in for the HuggingFace inference endpoint.
+
+    Answers every POST with a deterministic three-label result after `latency`
+    seconds, using at most `workers` concurrent model slots so requests queue
+    like they would on a real endpoint. Tracks request count, time spent
+    waiting for a slot and the peak number of requests in flight.
+    """
+
+    def __init__(self, latency=0.05, workers=4, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/models/mock-sentiment"
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.queue_wait_total = 0.0
+            self.in_flight = 0
+            self.peak_in_flight = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "mean_queue_ms": self.queue_wait_total / self.requests * 1000 if self.requests else 0.0,
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real endpoint, so clients can reuse connections;
+            # without Nagle, the separately written headers and body don't stall
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                arrived = time.monotonic()
+                with server._lock:
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                with server.slots:
+                    waited = time.monotonic() - arrived
+                    time.sleep(server.latency)
+                with server._lock:
+                    server.in_flight -= 1
+                    server.requests += 1
+                    server.queue_wait_total += waited
+
+                body = json.dumps([mock_prediction(str(payload.get("inputs", "")))]).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def mock_prediction(text):
+    """Deterministic fake model output in the raw LABEL_n format of the real endpoint"""
+    rng = random.Random(zlib.crc32(text.encode("utf-8")))
+    top = rng.uniform(0.4, 0.98)
+    rest = 1 - top
+    second = rest * rng.random()
+    labels = ["LABEL_0", "LABEL_1", "LABEL_2"]
+    rng.shuffle(labels)
+    scores = [top, second, rest - second]
+    return [{"label": label, "score": score} for label, score in zip(labels, scores)]
+
+
+class ResourceSampler:
+    """Sample this process's CPU utilisation and resident memory in the background"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss_mb = max(self.peak_rss_mb, current_rss_mb())
+
+    def __enter__(self):
+        self.peak_rss_mb = current_rss_mb()
+        self._wall = time.monotonic()
+        self._cpu = time.process_time()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.wall_seconds = time.monotonic() - self._wall
+        # 100% means one core fully busy
+        self.cpu_percent = (time.process_time() - self._cpu) / self.wall_seconds * 100 if self.wall_seconds else 0.0
+        self.peak_rss_mb = max(self.peak_rss_mb, current_rss_mb())
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # Peak rather than current where /proc isn't available (ru_maxrss is bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def session_lines(session_id, lines):
+    """Distinct input lines per session so caches don't hide the real work"""
+    return [f"{SAMPLE_LINES[(session_id + i) % len(SAMPLE_LINES)]} (#{session_id}-{i})" for i in range(lines)]
+
+
+def run_session(session_id, flow, lines, app_path=APP_PATH, timeout=SESSION_TIMEOUT):
+    """
+    Drive one simulated analyst through the manual or upload tab with AppTest,
+    including rendering, charts and the inline PDF export. Returns a dict with
+    the session's total latency and the time spent on the analysis run itself.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    texts = session_lines(session_id, lines)
+    start = time.monotonic()
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    at.run()
+
+    if flow == "manual":
+        at.text_area(key="manual_text_input").input("\n".join(texts)).run()
+        button = at.button(key="manual_analyze_button")
+    else:
+        half = len(texts) // 2
+        files = [
+            (f"session_{session_id}_a.txt", "\n".join(texts[:half]).encode("utf-8"), "text/plain"),
+            (f"session_{session_id}_b.txt", "\n".join(texts[half:]).encode("utf-8"), "text/plain"),
+        ]
+        at.file_uploader(key="file_uploader").set_value(files).run()
+        button = at.button(key="upload_analyze_button")
+
+    analysis_start = time.monotonic()
+    button.click().run()
+    finished = time.monotonic()
+
+    error = None
+    if at.exception:
+        error = at.exception[0].message
+    elif not at.success or "Analysis completed" not in at.success[-1].value:
+        error = "Analysis did not complete"
+    return {
+        "session": session_id,
+        "flow": flow,
+        "latency": finished - start,
+        "analysis_seconds": finished - analysis_start,
+        "error": error,
+    }
+
+
+def _level_flows(flow, level):
+    return [("manual", "upload")[i % 2] if flow == "mixed" else flow for i in range(level)]
+
+
+def measure_baseline(flow, lines, app_path=APP_PATH, runs=BASELINE_RUNS):
+    """
+    Mean latency of sessions run one at a time with nothing else going on,
+    the reference for queue_delay_s. A mixed flow runs both tabs each time.
+    """
+    flows = (["manual", "upload"] if flow == "mixed" else [flow]) * runs
+    sessions = [run_session(-2 - i, session_flow, lines, app_path) for i, session_flow in enumerate(flows)]
+    return sum(s["latency"] for s in sessions) / len(sessions)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = (len(values) - 1) * q
+    lower, upper = int(index), min(int(index) + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def summarize_level(sessions, wall_seconds, lines, baseline=None):
+    """Reduce the session results of one concurrency level to a capacity curve row"""
+    latencies = [s["latency"] for s in sessions]
+    succeeded = [s for s in sessions if not s["error"]]
+    mean_latency = sum(latencies) / len(latencies) if latencies else 0.0
+    return {
+        "sessions": len(sessions),
+        "p50_s": round(_percentile(latencies, 0.5), 3),
+        "p95_s": round(_percentile(latencies, 0.95), 3),
+        "max_s": round(max(latencies, default=0.0), 3),
+        "mean_analysis_s": round(sum(s["analysis_seconds"] for s in sessions) / len(sessions), 3) if sessions else 0.0,
+        # Extra time a session waited behind the others compared to running alone
+        "queue_delay_s": round(max(mean_latency - baseline, 0.0), 3) if baseline is not None else 0.0,
+        "errors": len(sessions) - len(succeeded),
+        "sessions_per_min": round(len(succeeded) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "lines_per_s": round(len(succeeded) * lines / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+def run_load_test(levels=DEFAULT_LEVELS, flow="mixed", lines=DEFAULT_LINES, latency=0.05, workers=4,
+                  app_path=APP_PATH, warmup=True, progress=None):
+    """
+    Run the app under increasing numbers of concurrent sessions.
+
+    A MockInferenceServer is started and the app is pointed at it through
+    HUGGINGFACE_API_URL, with a throwaway result store. Sessions run in
+    threads of this process, like sessions of one `streamlit run` server.
+    Returns one capacity curve row per level with latency percentiles,
+    throughput, CPU, peak memory and queueing at the endpoint. Queue delay
+    is measured against lone sessions run before the first level.
+    Must run before the app modules are imported, e.g. in a fresh process.
+    """
+    if flow not in FLOWS:
+        raise ValueError(f"Unknown flow: {flow}")
+
+    tmp_dir = tempfile.TemporaryDirectory()
+    with tmp_dir, MockInferenceServer(latency=latency, workers=workers) as server:
+        os.environ["HUGGINGFACE_API_URL"] = server.url
+        os.environ.setdefault("HUGGINGFACE_API_KEY", "load-test")
+        os.environ["SENTIMENT_DB_PATH"] = os.path.join(tmp_dir.name, "results.db")
+        api_client = sys.modules.get("utils.api_client")
+        if api_client is not None and api_client.API_URL != server.url:
+            raise RuntimeError("utils.api_client was imported before the load test; run it in a fresh process")
+
+        if warmup:
+            # Pays for imports and lets the adaptive rate controller ramp up
+            run_session(-1, "manual", lines, app_path)
+        baseline = measure_baseline(flow, lines, app_path)
+
+        curve = []
+        for level in levels:
+            server.reset_stats()
+            flows = _level_flows(flow, level)
+            with ResourceSampler() as sampler, ThreadPoolExecutor(max_workers=level) as executor:
+                sessions = list(executor.map(
+                    lambda args: run_session(args[0], args[1], lines, app_path), enumerate(flows)
+                ))
+
+            row = summarize_level(sessions, sampler.wall_seconds, lines, baseline)
+            endpoint = server.stats()
+            row.update({
+                "cpu_percent": round(sampler.cpu_percent, 1),
+                "peak_rss_mb": round(sampler.peak_rss_mb, 1),
+                "endpoint_requests": endpoint["requests"],
+                "endpoint_queue_ms": round(endpoint["mean_queue_ms"], 1),
+                "endpoint_peak_in_flight": endpoint["peak_in_flight"],
+            })
+            curve.append(row)
+            if progress:
+                progress(row, sessions)
+    return curve
+
+
+def max_sessions_within_slo(curve, slo_seconds=DEFAULT_SLO_SECONDS):
+    """Largest tested level whose p95 latency meets the SLO without errors, or 0"""
+    passing = [row["sessions"] for row in curve if row["p95_s"] <= slo_seconds and not row["errors"]]
+    return max(passing, default=0)
+
+
+def plot_capacity_curve(curve, slo_seconds=DEFAULT_SLO_SECONDS):
+    """p50/p95 session latency and throughput against concurrent sessions"""
+    import plotly.graph_objects as go
+
+    sessions = [row["sessions"] for row in curve]
+    fig = go.Figure([
+        go.Scatter(x=sessions, y=[row["p50_s"] for row in curve], name="p50 latency (s)", mode="lines+markers"),
+        go.Scatter(x=sessions, y=[row["p95_s"] for row in curve], name="p95 latency (s)", mode="lines+markers"),
+        go.Scatter(x=sessions, y=[row["sessions_per_min"] for row in curve], name="Sessions / min",
+                   mode="lines+markers", yaxis="y2"),
+    ])
+    fig.add_hline(y=slo_seconds, line_dash="dash", annotation_text="SLO")
+    fig.update_layout(
+        title="Capacity Curve",
+        xaxis_title="Concurrent sessions",
+        yaxis_title="Latency (s)",
+        yaxis2={"title": "Sessions / min", "overlaying": "y", "side": "right"}
+    )
+    return fig
+
+
+def main(argv=None):
+    """Command line entry point: print a capacity curve for one app instance"""
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Load test the Streamlit app with concurrent simulated sessions")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(DEFAULT_LEVELS),
+                        help="Concurrent session counts to test")
+    parser.add_argument("--flow", choices=FLOWS, default="mixed", help="Tab each session uses")
+    parser.add_argument("--lines", type=int, default=DEFAULT_LINES, help="Lines analyzed per session")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock model latency per request (seconds)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests the mock endpoint serves")
+    parser.add_argument("--slo", type=float, default=DEFAULT_SLO_SECONDS, help="p95 session latency target (seconds)")
+    parser.add_argument("--csv", help="Write the capacity curve to this CSV file")
+    parser.add_argument("--html", help="Write a capacity curve chart to this HTML file")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the warm-up session")
+    args = parser.parse_args(argv)
+
+    # The app loads its logo and fonts relative to its own folder
+    os.chdir(os.path.dirname(APP_PATH))
+
+    def report(row, sessions):
+        print(f"{row['sessions']} sessions: p95 {row['p95_s']:.2f}s, {row['sessions_per_min']} sessions/min, "
+              f"CPU {row['cpu_percent']}%, {row['errors']} errors")
+        for session in sessions:
+            if session["error"]:
+                print(f"  session {session['session']} ({session['flow']}): {session['error']}")
+
+    curve = run_load_test(args.levels, args.flow, args.lines, args.latency, args.workers,
+                          warmup=not args.no_warmup, progress=report)
+
+    df = pd.DataFrame(curve)
+    print()
+    print(df.to_string(index=False))
+    print(f"\nMax concurrent sessions with p95 <= {args.slo:g}s: {max_sessions_within_slo(curve, args.slo)}")
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+    if args.html:
+        plot_capacity_curve(curve, args.slo).write_html(args.html)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.api_client import API_URL, KEYWORD_METHODS, batch_analyze_sentiment_with_keywords
+from utils.language_detection import DEFAULT_LANGUAGE, group_by_language
+from utils.rate_controller import get_rate_controller
+from utils.text_processing import get_keyword_extractor, get_stop_words
+
+MULTILINGUAL_API_URL = os.getenv(
+    "HUGGINGFACE_MULTILINGUAL_API_URL",
+    "https://api-inference.huggingface.co/models/cardiffnlp/twitter-xlm-roberta-base-sentiment"
+)
+
+_GROUP_DONE = object()
+
+
+def get_language_api_url(language):
+    """
+    Model endpoint for a language: HUGGINGFACE_API_URL_<LANG> when set
+    (e.g. HUGGINGFACE_API_URL_DE), otherwise API_URL for English and the
+    multilingual model for everything else.
+    """
+    override = os.getenv(f"HUGGINGFACE_API_URL_{language.upper()}")
+    if override:
+        return override
+    return API_URL if language == DEFAULT_LANGUAGE else MULTILINGUAL_API_URL
+
+
+def warm_language_pool(language):
+    """Load a language's YAKE extractor, stop words and rate controller so its batch starts warm"""
+    get_keyword_extractor(language=language)
+    get_stop_words(language)
+    get_rate_controller(get_language_api_url(language))
+
+
+def batch_analyze_multilingual(text_list, progress_callback=None, metadata=None, result_callback=None,
+                               keyword_method="yake", escalation_threshold=None, max_workers=None):
+    """
+    Detect the language of every text and score each language group on its own
+    model endpoint with its own YAKE extractor.
+
+    Groups run concurrently, one thread per language, and results are merged
+    back in input order with a "language" field added. Callbacks are invoked
+    on the calling thread (Streamlit can't draw from worker threads), in
+    completion order. Tiered scoring only applies to English lines since the
+    lexicon is English. With keyword_method="tfidf", IDF is computed per
+    language group and non-English groups filter YAKE's stop words for their
+    language instead of the English list. Otherwise behaves like
+    batch_analyze_sentiment_with_keywords.
+    """
+    if keyword_method not in KEYWORD_METHODS:
+        raise ValueError(f"Unknown keyword method: {keyword_method}")
+
+    text_list = list(text_list)
+    groups = group_by_language(text_list)
+    results = [None] * len(text_list)
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def run_group(language, indices):
+        positions = iter(indices)
+
+        def forward(result):
+            if stop.is_set():
+                raise RuntimeError("Analysis cancelled")
+            events.put((next(positions), result))
+
+        try:
+            warm_language_pool(language)
+            batch_analyze_sentiment_with_keywords(
+                [text_list[i] for i in indices],
+                metadata=[{**(metadata[i] if metadata else {}), "language": language} for i in indices],
+                result_callback=forward,
+                keyword_method=keyword_method,
+                escalation_threshold=escalation_threshold if language == DEFAULT_LANGUAGE else None,
+                language=language,
+                api_url=get_language_api_url(language)
+            )
+        except Exception as e:
+            # Whatever the group didn't finish is reported as failed
+            for i in positions:
+                result = {"text": text_list[i], "error": str(e), "language": language}
+                if metadata:
+                    result.update(metadata[i])
+                events.put((i, result))
+        finally:
+            events.put(_GROUP_DONE)
+
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(groups), 1)) as executor:
+        for language, indices in groups.items():
+            executor.submit(run_group, language, indices)
+
+        remaining = len(groups)
+        try:
+            while remaining:
+                event = events.get()
+                if event is _GROUP_DONE:
+                    remaining -= 1
+                    continue
+                i, result = event
+                results[i] = result
+                completed += 1
+                if result_callback:
+                    result_callback(result)
+                if progress_callback:
+                    progress_callback(completed, len(text_list))
+        finally:
+            # A raising callback (e.g. Streamlit stopping the script) stops the other groups too
+            stop.set()
+
+    return results
@@ -0,0 +1,204 @@
+import re
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import islice
+from utils.aggregation import SentimentAggregator
+from utils.api_client import batch_analyze_sentiment_with_keywords
+from utils.file_processing import iter_file_lines
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_DEDUP_WINDOW = 100_000
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+_DONE = object()
+
+
+def extract_stream(paths):
+    """Extract stage: stream line dicts from every file in turn"""
+    for path in paths:
+        yield from iter_file_lines(path)
+
+
+def normalize_stream(lines, dedup_window=DEFAULT_DEDUP_WINDOW):
+    """
+    Normalize/dedup stage: collapse whitespace, drop empty lines and lines
+    already seen among the last dedup_window distinct lines. Only 16-byte
+    digests are remembered, so memory stays bounded however long the stream is.
+    A dedup_window of 0 keeps repeated lines. Accepts line dicts or plain strings.
+    """
+    seen = OrderedDict()
+    for line in lines:
+        if isinstance(line, str):
+            line = {"text": line}
+        text = WHITESPACE_PATTERN.sub(" ", line["text"]).strip()
+        if not text:
+            continue
+
+        if dedup_window:
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+            if digest in seen:
+                seen.move_to_end(digest)
+                continue
+            seen[digest] = None
+            if len(seen) > dedup_window:
+                seen.popitem(last=False)
+
+        yield {**line, "text": text}
+
+
+def score_stream(lines, batch_size=DEFAULT_BATCH_SIZE, **options):
+    """
+    Score stage: analyze lines in micro-batches of batch_size and yield results.
+    options are passed to batch_analyze_sentiment_with_keywords (note that
+    TF-IDF keywords are computed per micro-batch here).
+    """
+    lines = iter(lines)
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            return
+        yield from batch_analyze_sentiment_with_keywords(
+            [line["text"] for line in batch],
+            metadata=[{k: v for k, v in line.items() if k != "text"} for line in batch],
+            **options
+        )
+
+
+def _put(outbox, item, stop):
+    """Put with backpressure, giving up if the pipeline is being torn down"""
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pump(stream, outbox, stop, errors):
+    """Run a generator stage in its own thread, feeding a bounded queue"""
+    try:
+        for item in stream:
+            if not _put(outbox, item, stop):
+                return
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        _put(outbox, _DONE, stop)
+
+
+def _drain(inbox, stop):
+    """Iterate over a queue until its producer signals completion"""
+    while not stop.is_set():
+        try:
+            item = inbox.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        yield item
+
+
+def run_pipeline(source, sinks=(), queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 dedup_window=DEFAULT_DEDUP_WINDOW, progress_callback=None, aggregator=None, **options):
+    """
+    Stream source through extract -> normalize/dedup -> score -> aggregate -> sinks.
+
+    source is an iterable of line dicts or strings (e.g. extract_stream(paths)).
+    Stages run in separate threads joined by queues of at most queue_size items,
+    so a slow scoring stage throttles extraction instead of buffering the whole
+    input, and memory stays constant regardless of input size. Every result
+    goes straight to the aggregator and to each sink's write(); sinks are
+    closed at the end. progress_callback(processed) is called per result.
+    Returns the SentimentAggregator.
+    """
+    aggregator = aggregator or SentimentAggregator()
+    stop = threading.Event()
+    errors = []
+    lines_queue = queue.Queue(maxsize=queue_size)
+    results_queue = queue.Queue(maxsize=queue_size)
+
+    threads = [
+        threading.Thread(
+            target=_pump,
+            args=(normalize_stream(source, dedup_window), lines_queue, stop, errors),
+            daemon=True
+        ),
+        threading.Thread(
+            target=_pump,
+            args=(score_stream(_drain(lines_queue, stop), batch_size, **options), results_queue, stop, errors),
+            daemon=True
+        ),
+    ]
+    for thread in threads:
+        thread.start()
+
+    processed = 0
+    try:
+        for result in _drain(results_queue, stop):
+            aggregator.add(result)
+            for sink in sinks:
+                sink.write(result)
+            processed += 1
+            if progress_callback:
+                progress_callback(processed)
+    finally:
+        # Unblocks the stage threads if we're leaving early
+        stop.set()
+        for thread in threads:
+            thread.join()
+        for sink in sinks:
+            sink.close()
+
+    if errors:
+        raise errors[0]
+    return aggregator
+
+
+def main(argv=None):
+    """Command line entry point: stream files through the pipeline into CSV/JSONL/the result store"""
+    import argparse
+    from export.export_csv import CsvStreamWriter
+    from export.export_json import JsonlStreamWriter
+    from utils.result_store import ResultStore, ResultStoreWriter
+
+    parser = argparse.ArgumentParser(description="Stream TXT/PDF/DOCX/ZIP files through sentiment analysis")
+    parser.add_argument("paths", nargs="+", help="Files to analyze")
+    parser.add_argument("--csv", help="Write results to this CSV file")
+    parser.add_argument("--jsonl", help="Write raw results to this JSON Lines file")
+    parser.add_argument("--store", action="store_true", help="Append results to the persistent result store")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--keyword-method", choices=["yake", "tfidf"], default="yake")
+    parser.add_argument("--escalation-threshold", type=float, help="Enable tiered scoring at this lexicon confidence")
+    args = parser.parse_args(argv)
+
+    sinks = []
+    if args.csv:
+        sinks.append(CsvStreamWriter(args.csv))
+    if args.jsonl:
+        sinks.append(JsonlStreamWriter(args.jsonl))
+    if args.store:
+        sinks.append(ResultStoreWriter(ResultStore()))
+
+    aggregator = run_pipeline(
+        extract_stream(args.paths),
+        sinks=sinks,
+        queue_size=args.queue_size,
+        batch_size=args.batch_size,
+        progress_callback=lambda n: print(f"\rAnalyzed {n} lines", end="", flush=True),
+        keyword_method=args.keyword_method,
+        escalation_threshold=args.escalation_threshold
+    )
+    counts, percentages = aggregator.distribution()
+    print()
+    for label, count in counts.items():
+        print(f"{label.title()}: {count} ({percentages.get(label, 0):.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
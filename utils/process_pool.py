@@ -0,0 +1,18 @@
+import multiprocessing
+
+# Imported once by the (single-threaded) fork server so workers start warm
+FORKSERVER_PRELOAD = ["utils.file_processing", "utils.sharding"]
+
+
+def get_process_context():
+    """
+    Multiprocessing context for worker pools started from the app.
+    Forking a multi-threaded process (like the Streamlit server) can deadlock
+    the child on locks held by other threads, so workers are started fresh
+    with forkserver where available and spawn elsewhere.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+        return context
+    return multiprocessing.get_context("spawn")
@@ -0,0 +1,227 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from multiprocessing.managers import BaseManager
+
+THROTTLED_STATUS_CODES = {429, 503}
+# Ceiling on requests/second per endpoint; raise it for endpoints with more capacity
+DEFAULT_MAX_RATE = float(os.getenv("HUGGINGFACE_MAX_RATE", "20"))
+# Slots a worker process reserves per round trip to the shared controller
+DEFAULT_RESERVE_BATCH = 8
+
+
+class AdaptiveRateController:
+    """
+    AIMD (additive increase, multiplicative decrease) request rate controller.
+
+    Callers take a slot with acquire() before each request and report the outcome
+    with record(). The rate grows by roughly `increase` requests/second every second
+    while responses succeed, and is multiplied by `decrease` when the API throttles
+    us (429/503), a request fails, or latency rises well above its running average.
+    A single controller is thread-safe, so concurrent sessions share one rate,
+    which never exceeds max_rate (default DEFAULT_MAX_RATE).
+    """
+
+    def __init__(self, initial_rate=1.0, min_rate=0.2, max_rate=DEFAULT_MAX_RATE, increase=0.5,
+                 decrease=0.5, latency_tolerance=2.0, idle_gap=5.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.latency_ewma = None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._last_decrease = float("-inf")
+        self.idle_gap = idle_gap
+        self.interval_ewma = None
+        self._last_completion = None
+
+    def _reserve(self):
+        """Claim the next request slot and return how long to wait for it"""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        return slot - now
+
+    def reserve(self, count, samples=()):
+        """
+        Report finished requests as (latency, status_code, seconds_ago) samples,
+        then claim count consecutive slots; returns how long to wait for each.
+        Lets another process pace a batch of requests in one round trip.
+        """
+        for latency, status_code, age in samples:
+            self.record(latency, status_code, age)
+        return [self._reserve() for _ in range(count)]
+
+    def set_max_rate(self, max_rate):
+        """Change the ceiling, e.g. for an endpoint that can take more requests"""
+        with self._lock:
+            self.max_rate = max_rate
+            self.rate = min(self.rate, max_rate)
+
+    def acquire(self):
+        """Block until the next request slot is available"""
+        wait = self._reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+    async def acquire_async(self):
+        """Wait for the next request slot without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def record(self, latency, status_code=200, age=0.0):
+        """
+        Report the latency (seconds) and HTTP status of a finished request,
+        which finished age seconds ago
+        """
+        with self._lock:
+            now = self._clock() - age
+            if self._last_completion is not None:
+                interval = now - self._last_completion
+                # Gaps between runs are idle time, not a sign of low throughput;
+                # batched reports from other processes can arrive out of order
+                if 0 <= interval <= max(self.idle_gap, 2.0 / self.rate):
+                    self.interval_ewma = (
+                        interval if self.interval_ewma is None
+                        else 0.8 * self.interval_ewma + 0.2 * interval
+                    )
+            self._last_completion = now if self._last_completion is None else max(now, self._last_completion)
+
+            throttled = status_code is None or status_code in THROTTLED_STATUS_CODES
+            slow = (
+                self.latency_ewma is not None
+                and latency > self.latency_ewma * self.latency_tolerance
+            )
+
+            if throttled or slow:
+                # Back off at most once per round trip so one burst of 429s
+                # doesn't collapse the rate to the floor
+                if now - self._last_decrease >= (self.latency_ewma or latency):
+                    self.rate = max(self.min_rate, self.rate * self.decrease)
+                    self._last_decrease = now
+                    # Push the next free slot back, never pull it in past slots already reserved
+                    self._next_slot = max(self._next_slot, now + 1.0 / self.rate)
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+            if not throttled:
+                if self.latency_ewma is None:
+                    self.latency_ewma = latency
+                else:
+                    self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+    def throughput(self):
+        """
+        Completed requests per second while busy, from a moving average of the
+        intervals between completions; capped by (and falling back to) the target rate.
+        """
+        with self._lock:
+            if self.interval_ewma:
+                return min(1.0 / self.interval_ewma, self.rate)
+            return self.rate
+
+    def estimate_seconds(self, count):
+        """Estimate how long `count` requests will take at the measured throughput"""
+        return count / self.throughput()
+
+
+class BatchedRateController:
+    """
+    Worker-side stand-in for a shared controller in another process.
+
+    Slots are reserved batch_size at a time and finished requests are
+    reported with the next reservation, so pacing costs one round trip per
+    batch instead of two per request. A throttled or failed request drops
+    the remaining local slots, so the next request waits at the reduced
+    rate. Call flush() when done to report the last requests.
+    """
+
+    def __init__(self, controller, batch_size=DEFAULT_RESERVE_BATCH, clock=time.monotonic, sleep=time.sleep):
+        self.controller = controller
+        self.batch_size = batch_size
+        self._clock = clock
+        self._sleep = sleep
+        self._slots = deque()
+        self._samples = []
+
+    def _take_samples(self):
+        now = self._clock()
+        samples = [(latency, status_code, now - finished) for latency, status_code, finished in self._samples]
+        self._samples = []
+        return samples
+
+    def acquire(self):
+        if not self._slots:
+            waits = self.controller.reserve(self.batch_size, self._take_samples())
+            now = self._clock()
+            self._slots.extend(now + wait for wait in waits)
+        wait = self._slots.popleft() - self._clock()
+        if wait > 0:
+            self._sleep(wait)
+
+    def record(self, latency, status_code=200):
+        self._samples.append((latency, status_code, self._clock()))
+        if status_code is None or status_code in THROTTLED_STATUS_CODES:
+            self._slots.clear()
+
+    def flush(self):
+        if self._samples:
+            self.controller.reserve(0, self._take_samples())
+
+
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def get_rate_controller(key="default", **kwargs):
+    """Return the process-wide controller for `key`, creating it on first use"""
+    with _controllers_lock:
+        if key not in _controllers:
+            _controllers[key] = AdaptiveRateController(**kwargs)
+        return _controllers[key]
+
+
+class _ControllerManager(BaseManager):
+    pass
+
+
+_ControllerManager.register(
+    "get_rate_controller", get_rate_controller,
+    exposed=("acquire", "record", "reserve", "throughput", "estimate_seconds")
+)
+_shared_address = None
+_shared_lock = threading.Lock()
+
+
+def share_rate_controllers():
+    """
+    Serve this process's controllers to worker processes, so requests made
+    by a process pool are paced against the same budget as everything else.
+    Starts the server thread on first use; returns (address, authkey) for
+    connect_rate_controller().
+    """
+    global _shared_address
+    with _shared_lock:
+        if _shared_address is None:
+            authkey = os.urandom(32)
+            server = _ControllerManager(address=("127.0.0.1", 0), authkey=authkey).get_server()
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            _shared_address = (server.address, authkey)
+        return _shared_address
+
+
+def connect_rate_controller(address, authkey, key="default"):
+    """Return a proxy to the controller for `key` shared by share_rate_controllers()"""
+    manager = _ControllerManager(address=address, authkey=authkey)
+    manager.connect()
+    return manager.get_rate_controller(key)
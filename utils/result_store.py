@@ -0,0 +1,299 @@
+import os
+import time
+import sqlite3
+from contextlib import closing, contextmanager, nullcontext
+from utils.aggregation import get_sentiment_label
+
+DEFAULT_DB_PATH = os.getenv("SENTIMENT_DB_PATH", "data/sentiment_results.db")
+# Rollup granularity; quarter hours line up with local midnight in every time zone
+BUCKET_SECONDS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    analyzed_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    sentiment TEXT NOT NULL,
+    confidence REAL,
+    keywords TEXT NOT NULL DEFAULT '',
+    source TEXT,
+    page INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_results_analyzed_at ON results (analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_results_sentiment ON results (sentiment, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_results_source ON results (source, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_results_confidence ON results (confidence);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(
+    text, keywords, content='results', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+    INSERT INTO results_fts (rowid, text, keywords) VALUES (new.id, new.text, new.keywords);
+END;
+CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+    INSERT INTO results_fts (results_fts, rowid, text, keywords) VALUES ('delete', old.id, old.text, old.keywords);
+END;
+
+-- Per quarter-hour label counts, so time-range counts don't scan every row
+CREATE TABLE IF NOT EXISTS result_counts (
+    bucket INTEGER NOT NULL,
+    sentiment TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bucket, sentiment)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS result_counts_ai AFTER INSERT ON results BEGIN
+    INSERT INTO result_counts (bucket, sentiment, count)
+    VALUES (CAST(new.analyzed_at / 900 AS INTEGER), new.sentiment, 1)
+    ON CONFLICT (bucket, sentiment) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS result_counts_ad AFTER DELETE ON results BEGIN
+    UPDATE result_counts SET count = count - 1
+    WHERE bucket = CAST(old.analyzed_at / 900 AS INTEGER) AND sentiment = old.sentiment;
+END;
+
+-- Counts deletions; with MAX(id) this identifies the state of the results
+CREATE TABLE IF NOT EXISTS store_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    deletions INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO store_version (id, deletions) VALUES (1, 0);
+CREATE TRIGGER IF NOT EXISTS store_version_ad AFTER DELETE ON results BEGIN
+    UPDATE store_version SET deletions = deletions + 1 WHERE id = 1;
+END;
+
+-- Distinct sources, so "source contains" filters scan this instead of every row
+CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS sources_ai AFTER INSERT ON results WHEN new.source IS NOT NULL BEGIN
+    INSERT OR IGNORE INTO sources (source) VALUES (new.source);
+END;
+"""
+
+BACKFILL = """
+INSERT INTO result_counts (bucket, sentiment, count)
+    SELECT CAST(analyzed_at / 900 AS INTEGER), sentiment, COUNT(*) FROM results GROUP BY 1, 2;
+INSERT OR IGNORE INTO sources (source) SELECT DISTINCT source FROM results WHERE source IS NOT NULL;
+"""
+
+
+def _fts_query(query):
+    """Turn free text into an FTS5 query matching all words, ignoring FTS syntax"""
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    return " ".join(terms)
+
+
+class ResultStore:
+    """
+    Persistent SQLite index of analysis results.
+    Text and keywords are full-text indexed with FTS5; sentiment, time and
+    source have B-tree indexes so filtered queries stay fast on large stores.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Stores created before the rollup tables existed
+            if (conn.execute("SELECT 1 FROM results LIMIT 1").fetchone()
+                    and not conn.execute("SELECT 1 FROM result_counts LIMIT 1").fetchone()):
+                with conn:
+                    conn.executescript(BACKFILL)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        # WAL makes NORMAL durable enough and much faster for bulk inserts
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Connection whose writes are committed together on exit, or rolled back on error"""
+        with closing(self._connect()) as conn, conn:
+            yield conn
+
+    def add_results(self, results, analyzed_at=None, conn=None):
+        """
+        Append analysis results (as returned by the batch functions); returns the row count.
+        Pass conn from transaction() to commit them together with other writes.
+        """
+        analyzed_at = analyzed_at if analyzed_at is not None else time.time()
+        rows = []
+        for r in results:
+            label, confidence = get_sentiment_label(r)
+            if confidence is None:
+                label = "error"
+            rows.append((
+                analyzed_at,
+                r["text"],
+                label,
+                confidence,
+                ", ".join(r.get("keywords", [])) if confidence is not None else "",
+                r.get("source"),
+                r.get("page")
+            ))
+
+        with nullcontext(conn) if conn is not None else self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO results (analyzed_at, text, sentiment, confidence, keywords, source, page) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def delete_source(self, source, conn=None):
+        """
+        Delete every result extracted from source, including the members of
+        an archive at that path ("archive.zip/member.txt"); returns the row count
+        """
+        with nullcontext(conn) if conn is not None else self.transaction() as conn:
+            # A range rather than LIKE, so it uses the source index and needs no escaping
+            return conn.execute(
+                "DELETE FROM results WHERE source = ? OR (source >= ? AND source < ?)",
+                (source, source + "/", source + "0")
+            ).rowcount
+
+    def _where(self, query=None, sentiments=None, since=None, until=None, min_confidence=None, source=None):
+        clauses, params = [], []
+        if query and query.strip():
+            clauses.append("r.id IN (SELECT rowid FROM results_fts WHERE results_fts MATCH ?)")
+            params.append(_fts_query(query))
+        if sentiments:
+            clauses.append(f"r.sentiment IN ({', '.join('?' * len(sentiments))})")
+            params.extend(s.lower() for s in sentiments)
+        if since is not None:
+            clauses.append("r.analyzed_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("r.analyzed_at < ?")
+            params.append(until)
+        if min_confidence:
+            clauses.append("r.confidence >= ?")
+            params.append(min_confidence)
+        if source:
+            clauses.append("r.source IN (SELECT source FROM sources WHERE source LIKE ?)")
+            params.append(f"%{source}%")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def search(self, limit=1000, **filters):
+        """
+        Return the newest matching results, most recent first.
+        Filters: query (full text over text and keywords), sentiments (labels),
+        since/until (unix timestamps), min_confidence (0-1) and source (substring).
+        Rows come back as result dicts accepted by results_to_dataframe, plus analyzed_at.
+        """
+        where, params = self._where(**filters)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT r.analyzed_at, r.text, r.sentiment, r.confidence, r.keywords, r.source, r.page "
+                f"FROM results r{where} ORDER BY r.analyzed_at DESC, r.id DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+
+        results = []
+        for analyzed_at, text, sentiment, confidence, keywords, source, page in rows:
+            if sentiment == "error":
+                result = {"text": text, "error": "Analysis failed"}
+            else:
+                result = {
+                    "text": text,
+                    "sentiment": [{"label": sentiment, "score": confidence}],
+                    "keywords": keywords.split(", ") if keywords else []
+                }
+            if source is not None:
+                result["source"] = source
+                result["page"] = page
+            result["analyzed_at"] = analyzed_at
+            results.append(result)
+        return results
+
+    def version(self):
+        """
+        Value that changes whenever results are added or deleted, e.g. for cache
+        keys. Ids of deleted rows can be reused, so the newest id alone isn't enough.
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT (SELECT MAX(id) FROM results), deletions FROM store_version WHERE id = 1"
+            ).fetchone()
+
+    def summarize(self, **filters):
+        """
+        Count matching results per sentiment label.
+        Counts filtered only by sentiment and time come from the quarter-hour
+        rollup, with exact counts for any partial quarter hour at the edges.
+        """
+        if filters.get("query", "").strip() or filters.get("min_confidence") or filters.get("source"):
+            where, params = self._where(**filters)
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    f"SELECT r.sentiment, COUNT(*) FROM results r{where} GROUP BY r.sentiment", params
+                ).fetchall()
+            return dict(rows)
+        return self._summarize_rollup(filters.get("sentiments"), filters.get("since"), filters.get("until"))
+
+    def _summarize_rollup(self, sentiments=None, since=None, until=None):
+        first = -(-since // BUCKET_SECONDS) if since is not None else None  # first whole bucket
+        end = until // BUCKET_SECONDS if until is not None else None  # bucket after the last whole one
+        if first is not None and end is not None and first >= end:
+            where, params = self._where(sentiments=sentiments, since=since, until=until)
+            with closing(self._connect()) as conn:
+                return dict(conn.execute(
+                    f"SELECT r.sentiment, COUNT(*) FROM results r{where} GROUP BY r.sentiment", params
+                ).fetchall())
+
+        clauses, params = ["count > 0"], []
+        if sentiments:
+            clauses.append(f"sentiment IN ({', '.join('?' * len(sentiments))})")
+            params.extend(s.lower() for s in sentiments)
+        if first is not None:
+            clauses.append("bucket >= ?")
+            params.append(int(first))
+        if end is not None:
+            clauses.append("bucket < ?")
+            params.append(int(end))
+
+        # Rows in the partial buckets outside [first, end) are counted exactly
+        edges = []
+        if first is not None and first * BUCKET_SECONDS > since:
+            edges.append((since, first * BUCKET_SECONDS))
+        if end is not None and end * BUCKET_SECONDS < until:
+            edges.append((end * BUCKET_SECONDS, until))
+
+        counts = {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT sentiment, SUM(count) FROM result_counts WHERE {' AND '.join(clauses)} GROUP BY sentiment",
+                params
+            ).fetchall()
+            for edge_since, edge_until in edges:
+                where, edge_params = self._where(sentiments=sentiments, since=edge_since, until=edge_until)
+                rows += conn.execute(
+                    f"SELECT r.sentiment, COUNT(*) FROM results r{where} GROUP BY r.sentiment", edge_params
+                ).fetchall()
+        for sentiment, count in rows:
+            counts[sentiment] = counts.get(sentiment, 0) + count
+        return counts
+
+
+class ResultStoreWriter:
+    """Streaming sink that appends results to a ResultStore in buffered batches"""
+
+    def __init__(self, store, flush_size=500):
+        self.store = store
+        self.flush_size = flush_size
+        self._buffer = []
+
+    def write(self, result):
+        self._buffer.append(result)
+        if len(self._buffer) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.store.add_results(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,161 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.api_client import API_URL, KEYWORD_METHODS, score_text_tiered, shadow_score
+from utils.keyword_engine import extract_keywords_batch
+from utils.process_pool import get_process_context
+from utils.rate_controller import (
+    BatchedRateController, connect_rate_controller, get_rate_controller, share_rate_controllers
+)
+from utils.text_processing import extract_keywords, get_keyword_extractor
+
+DEFAULT_SHARD_SIZE = 256
+
+# Batched proxy to the parent's rate controller, set in each worker by _init_worker
+_controller = None
+
+
+def _init_worker(address, authkey, api_url):
+    """Load per-process resources once, before the first shard arrives"""
+    global _controller
+    get_keyword_extractor()
+    _controller = BatchedRateController(connect_rate_controller(address, authkey, api_url))
+
+
+def _score_shard(texts, keywords=None, escalation_threshold=None, api_url=None):
+    """
+    Score one shard inside a worker process.
+    Returns a compact columnar chunk instead of one result dict per item:
+    sentiments holds ((label, score), ...) tuples or an API error string,
+    keywords is None when the caller already has them, failures maps the
+    offset of any item that raised to its exception message, lexicon
+    lists the offsets scored without the model and shadow maps sampled
+    lexicon offsets to their model scores.
+    """
+    controller = _controller or get_rate_controller(api_url or API_URL)
+    sentiments = []
+    shard_keywords = [] if keywords is None else None
+    failures = {}
+    lexicon = []
+    shadow = {}
+
+    for offset, text in enumerate(texts):
+        sentiment, text_keywords = None, None
+        try:
+            sentiment, tier = score_text_tiered(text, controller, escalation_threshold, api_url)
+            if tier == "lexicon":
+                lexicon.append(offset)
+                shadow_result = shadow_score(text, tier, controller, api_url)
+                if shadow_result:
+                    shadow[offset] = tuple((item["label"], item["score"]) for item in shadow_result)
+            if isinstance(sentiment, list):
+                sentiment = tuple((item["label"], item["score"]) for item in sentiment)
+            else:
+                sentiment = sentiment.get("error", "Unknown error")
+            if keywords is None:
+                text_keywords = extract_keywords(text)
+        except Exception as e:
+            failures[offset] = str(e)
+
+        sentiments.append(sentiment)
+        if keywords is None:
+            shard_keywords.append(text_keywords)
+
+    if _controller is not None:
+        _controller.flush()
+
+    return {"sentiments": sentiments, "keywords": shard_keywords, "failures": failures, "lexicon": lexicon, "shadow": shadow}
+
+
+def _unpack_shard(texts, chunk, keywords, tiered=False):
+    """Rebuild result dicts in the shape batch_analyze_sentiment_with_keywords returns"""
+    results = []
+    shard_keywords = keywords if keywords is not None else chunk["keywords"]
+    lexicon = set(chunk["lexicon"])
+
+    for offset, (text, sentiment) in enumerate(zip(texts, chunk["sentiments"])):
+        if offset in chunk["failures"]:
+            results.append({"text": text, "error": chunk["failures"][offset]})
+        elif isinstance(sentiment, str):
+            results.append({"text": text, "sentiment": {"error": sentiment}, "keywords": shard_keywords[offset]})
+        else:
+            results.append({
+                "text": text,
+                "sentiment": [{"label": label, "score": score} for label, score in sentiment],
+                "keywords": shard_keywords[offset]
+            })
+        if tiered and "error" not in results[-1]:
+            results[-1]["tier"] = "lexicon" if offset in lexicon else "model"
+            if offset in chunk["shadow"]:
+                results[-1]["shadow"] = [{"label": label, "score": score} for label, score in chunk["shadow"][offset]]
+    return results
+
+
+def sharded_batch_analyze(text_list, workers=None, shard_size=DEFAULT_SHARD_SIZE, progress_callback=None,
+                          metadata=None, result_callback=None, keyword_method="yake", escalation_threshold=None,
+                          api_url=None, max_rate=None):
+    """
+    Multi-process variant of batch_analyze_sentiment_with_keywords.
+
+    The input is split into shards of shard_size texts and scored on a pool of
+    `workers` processes (default: all cores). Each worker loads its resources
+    once and sends a shard back as one compact chunk; results are reassembled
+    in input order. A failing shard only marks its own texts as errors.
+    All workers pace their requests against this process's shared adaptive rate
+    controller for the endpoint, reserving slots a batch at a time, so adding
+    workers doesn't multiply the request rate: the whole pool is capped at the
+    controller's max_rate (DEFAULT_MAX_RATE, 20 requests/second unless
+    HUGGINGFACE_MAX_RATE is set). Pass max_rate to raise or lower that ceiling
+    for the endpoint; more workers only help while the rate is below it, or
+    while CPU work (keywords, lexicon) dominates. Workers are started with forkserver/spawn, never forked from the
+    (multi-threaded) server process. api_url selects the model endpoint.
+    TF-IDF keywords are computed once in the parent so IDF covers the whole batch.
+    escalation_threshold enables two-tier scoring as in batch_analyze_sentiment_with_keywords.
+    """
+    if keyword_method not in KEYWORD_METHODS:
+        raise ValueError(f"Unknown keyword method: {keyword_method}")
+
+    text_list = list(text_list)
+    workers = workers or os.cpu_count() or 1
+    shards = [(start, text_list[start:start + shard_size]) for start in range(0, len(text_list), shard_size)]
+    batch_keywords = extract_keywords_batch(text_list) if keyword_method == "tfidf" else None
+
+    api_url = api_url or API_URL
+    controller = get_rate_controller(api_url)
+    if max_rate is not None:
+        controller.set_max_rate(max_rate)
+    address, authkey = share_rate_controllers()
+
+    results = [None] * len(text_list)
+    completed = 0
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, max(len(shards), 1)),
+        mp_context=get_process_context(),
+        initializer=_init_worker,
+        initargs=(address, authkey, api_url)
+    ) as executor:
+        futures = {}
+        for start, texts in shards:
+            keywords = batch_keywords[start:start + len(texts)] if batch_keywords is not None else None
+            future = executor.submit(_score_shard, texts, keywords, escalation_threshold, api_url)
+            futures[future] = (start, texts, keywords)
+
+        for future in as_completed(futures):
+            start, texts, keywords = futures[future]
+            try:
+                shard_results = _unpack_shard(texts, future.result(), keywords, escalation_threshold is not None)
+            except Exception as e:
+                shard_results = [{"text": text, "error": f"Shard failed: {str(e)}"} for text in texts]
+
+            for offset, result in enumerate(shard_results):
+                if metadata:
+                    result.update(metadata[start + offset])
+                results[start + offset] = result
+                if result_callback:
+                    result_callback(result)
+
+            completed += len(texts)
+            if progress_callback:
+                progress_callback(completed, len(text_list))
+
+    return results
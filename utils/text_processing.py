@@ -1,33 +1,48 @@
 import yake
 import re
 from collections import Counter
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def get_keyword_extractor(top_n=5, language="en"):
+    """Build a YAKE extractor once per process and reuse it across calls"""
+    return yake.KeywordExtractor(lan=language, n=1, top=top_n)
 
 def extract_keywords(text, top_n=5, language="en"):
     """Extract keywords using YAKE algorithm"""
     try:
-        kw_extractor = yake.KeywordExtractor(lan=language, n=1, top=top_n)
+        kw_extractor = get_keyword_extractor(top_n, language)
         keywords = kw_extractor.extract_keywords(text)
         return [kw for kw, score in keywords]
     except Exception as e:
         # Fallback to simple frequency-based extraction
         return extract_keywords_simple(text, top_n)
 
+# Common stop words
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 
+    'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+    'my', 'your', 'his', 'her', 'its', 'our', 'their', 'this', 'that', 'these', 'those'
+})
+
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+@lru_cache(maxsize=None)
+def get_stop_words(language="en"):
+    """Stop words for a language: STOP_WORDS for English, YAKE's list otherwise"""
+    if language == "en":
+        return STOP_WORDS
+    return frozenset(word.lower() for word in get_keyword_extractor(language=language).stopword_set)
+
 def extract_keywords_simple(text, max_keywords=5):
     """Fallback simple keyword extraction using frequency analysis"""
     # Remove punctuation and convert to lowercase
-    clean_text = re.sub(r'[^\w\s]', '', text.lower())
-    
-    # Common stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 
-        'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must',
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-        'my', 'your', 'his', 'her', 'its', 'our', 'their', 'this', 'that', 'these', 'those'
-    }
+    clean_text = PUNCTUATION_PATTERN.sub('', text.lower())
     
     # Split into words and filter
-    words = [word for word in clean_text.split() if word not in stop_words and len(word) > 2]
+    words = [word for word in clean_text.split() if word not in STOP_WORDS and len(word) > 2]
     
     # Count frequency and return top keywords
     word_counts = Counter(words)
@@ -0,0 +1,380 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing, nullcontext
+from itertools import islice
+from utils.aggregation import SentimentAggregator
+from utils.file_processing import SUPPORTED_EXTENSIONS, get_file_type, iter_file_lines
+from utils.pipeline import run_pipeline
+from utils.result_store import ResultStore
+
+WATCHED_EXTENSIONS = SUPPORTED_EXTENSIONS + ("zip",)
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_RESCAN_INTERVAL = 300.0
+HASH_CHUNK_SIZE = 1 << 20
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    lines_done INTEGER NOT NULL,
+    lines_hash TEXT NOT NULL,
+    aggregate TEXT,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingest_aggregates (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+"""
+
+
+def _content_hash(path):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _lines_hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+class IngestState:
+    """
+    Per-file ingestion progress and the running aggregate, kept in SQLite.
+
+    For every file the last seen size, mtime and content hash are stored
+    along with how many extracted lines were already scored, a hash of
+    those lines and their aggregate, so a grown file can be resumed where it
+    left off and a rewritten one taken out of the running aggregate. The
+    content hash is left blank while lines are waiting to be retried.
+    Writes accept conn to join a ResultStore.transaction() on the same database.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(STATE_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _writing(self, conn=None):
+        return nullcontext(conn) if conn is not None else closing(self._connect())
+
+    def get_file(self, path):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT size, mtime, content_hash, lines_done, lines_hash, aggregate FROM ingested_files WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(("size", "mtime", "content_hash", "lines_done", "lines_hash"), row))
+        record["aggregate"] = SentimentAggregator.from_dict(json.loads(row[5])) if row[5] else SentimentAggregator()
+        return record
+
+    def put_file(self, path, size, mtime, content_hash, lines_done, lines_hash, aggregate, conn=None):
+        with self._writing(conn) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ingested_files "
+                "(path, size, mtime, content_hash, lines_done, lines_hash, aggregate, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime, content_hash, lines_done, lines_hash,
+                 json.dumps(aggregate.to_dict()), time.time())
+            )
+
+    def tracked_files(self, folder):
+        """Paths of every tracked file under folder"""
+        prefix = os.path.join(folder, "")
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT path FROM ingested_files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchall()
+        return [path for (path,) in rows]
+
+    def forget_files(self, paths):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("DELETE FROM ingested_files WHERE path = ?", [(p,) for p in paths])
+
+    def load_aggregate(self, name):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT state FROM ingest_aggregates WHERE name = ?", (name,)).fetchone()
+        return SentimentAggregator.from_dict(json.loads(row[0])) if row else SentimentAggregator()
+
+    def save_aggregate(self, name, aggregator, conn=None):
+        with self._writing(conn) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ingest_aggregates (name, state) VALUES (?, ?)",
+                (name, json.dumps(aggregator.to_dict()))
+            )
+
+
+def iter_watched_files(folder):
+    """Yield the supported files under folder, skipping hidden files and directories"""
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if not name.startswith(".") and get_file_type(name) in WATCHED_EXTENSIONS:
+                yield os.path.join(root, name)
+
+
+def _hash_lines(path, count):
+    """Hasher primed with the first count extracted lines of a file"""
+    hasher = _lines_hasher()
+    for line in islice(iter_file_lines(path), count):
+        hasher.update(line["text"].encode("utf-8") + b"\n")
+    return hasher
+
+
+def _resume_offset(path, record):
+    """
+    Return (start, hasher): the number of already scored lines still valid at
+    the top of the file and a hasher primed with them. A file whose scored
+    lines changed (rewritten rather than appended to) starts over from zero
+    and is ingested again as a new version.
+    """
+    if not record or not record["lines_done"]:
+        return 0, _lines_hasher()
+
+    hasher = _hash_lines(path, record["lines_done"])
+    if hasher.hexdigest() == record["lines_hash"]:
+        return record["lines_done"], hasher
+    return 0, _lines_hasher()
+
+
+class _ResultBuffer(list):
+    """Pipeline sink that keeps results in memory"""
+
+    def write(self, result):
+        self.append(result)
+
+    def close(self):
+        pass
+
+
+def _failure(result):
+    """Error message of a result whose scoring failed, else None"""
+    if "error" in result:
+        return result["error"]
+    if isinstance(result.get("sentiment"), dict):
+        return result["sentiment"].get("error", "Unknown error")
+    return None
+
+
+def ingest_file(path, state, store, aggregator, aggregate_name=None, **options):
+    """
+    Score the content of one file that hasn't been ingested yet.
+
+    Unchanged files (same size and mtime, or same content hash) are skipped
+    unless lines are waiting to be retried; for changed files only the lines after the last ingested offset are
+    scored, and a rewritten file replaces its earlier rows and counts. The
+    results, the file's progress and (under aggregate_name) the updated
+    aggregator are committed in one transaction, so an interrupted file is
+    scored again from the same offset. state must live in the store's database.
+    Every line is scored, including repeats (no dedup).
+    Progress stops at the first line that failed to score; it and the lines
+    after it are retried on the next scan, and a RuntimeError reports it
+    once the lines before it are committed.
+    Returns the number of new lines scored, or None if the file was unchanged.
+    """
+    if os.path.abspath(state.path) != os.path.abspath(store.path):
+        raise ValueError("Ingest state must be kept in the result store's database")
+    stat = os.stat(path)
+    record = state.get_file(path)
+    complete = record and record["content_hash"]
+    if complete and record["size"] == stat.st_size and record["mtime"] == stat.st_mtime:
+        return None
+
+    content_hash = _content_hash(path)
+    if complete and record["content_hash"] == content_hash:
+        state.put_file(path, stat.st_size, stat.st_mtime, content_hash,
+                       record["lines_done"], record["lines_hash"], record["aggregate"])
+        return None
+
+    start, hasher = _resume_offset(path, record)
+    lines_done = start
+
+    def new_lines():
+        nonlocal lines_done
+        for line in islice(iter_file_lines(path), start, None):
+            hasher.update(line["text"].encode("utf-8") + b"\n")
+            yield {**line, "line": lines_done}
+            lines_done += 1
+
+    # Held back until the whole file is scored, then committed in one go. Repeated
+    # lines ("OK", "Thanks") are kept so totals match what the app reports for the file
+    results = _ResultBuffer()
+    run_pipeline(new_lines(), sinks=[results], **{**options, "dedup_window": 0})
+    failed = next(((r["line"], _failure(r)) for r in results if _failure(r) is not None), None)
+    if failed:
+        lines_done = failed[0]
+        hasher = _hash_lines(path, lines_done)
+        results = [r for r in results if r["line"] < lines_done]
+    partial = SentimentAggregator().update(results)
+
+    # A rewritten file's earlier version is replaced, not counted twice
+    replaced = record["aggregate"] if record and start == 0 else None
+    file_aggregate = partial if start == 0 else record["aggregate"].merge(partial)
+
+    def apply(target):
+        if replaced is not None:
+            target.subtract(replaced)
+        return target.merge(partial)
+
+    with store.transaction() as conn:
+        if replaced is not None:
+            store.delete_source(path, conn=conn)
+        store.add_results(results, conn=conn)
+        state.put_file(path, stat.st_size, stat.st_mtime, "" if failed else content_hash, lines_done,
+                       hasher.hexdigest(), file_aggregate, conn=conn)
+        if aggregate_name is not None:
+            state.save_aggregate(aggregate_name, apply(SentimentAggregator.from_dict(aggregator.to_dict())), conn=conn)
+    apply(aggregator)
+
+    if failed:
+        raise RuntimeError(f"Line {failed[0] + 1} failed and will be retried on the next scan: {failed[1]}")
+    return lines_done - start
+
+
+def scan_once(folder, state=None, store=None, **options):
+    """
+    Ingest every new or changed file under folder once.
+
+    The running aggregate for the folder is loaded from state, updated and
+    saved with each file. Files that disappeared are forgotten so they are
+    ingested again if they come back. options are passed to run_pipeline.
+    Returns a summary dict with the files ingested, lines scored, per-file
+    errors and the running aggregator.
+    """
+    folder = os.path.abspath(folder)
+    store = store or ResultStore()
+    state = state or IngestState(store.path)
+    aggregator = state.load_aggregate(folder)
+    summary = {"files_seen": 0, "files_ingested": 0, "lines_scored": 0, "errors": {}, "aggregator": aggregator}
+
+    seen = set()
+    for path in iter_watched_files(folder):
+        seen.add(path)
+        summary["files_seen"] += 1
+        try:
+            scored = ingest_file(path, state, store, aggregator, aggregate_name=folder, **options)
+        except Exception as e:
+            summary["errors"][path] = str(e)
+            continue
+        if scored is not None:
+            summary["files_ingested"] += 1
+            summary["lines_scored"] += scored
+
+    state.forget_files([path for path in state.tracked_files(folder) if path not in seen])
+    return summary
+
+
+def watch(folder, settle=DEFAULT_SETTLE_SECONDS, interval=DEFAULT_RESCAN_INTERVAL,
+          on_scan=None, stop_event=None, **options):
+    """
+    Watch folder and ingest new content as it arrives.
+
+    File system events from watchdog trigger a scan once the folder has been
+    quiet for settle seconds, so files still being written aren't picked up
+    half way. A full rescan also runs every interval seconds to catch events
+    that were missed. on_scan(summary) is called after every scan; set
+    stop_event to stop watching.
+    """
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    folder = os.path.abspath(folder)
+    stop_event = stop_event or threading.Event()
+    changed = threading.Event()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Our own reads raise opened/closed events; only writes matter
+            if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+                return
+            paths = [event.src_path, getattr(event, "dest_path", "")]
+            if any(get_file_type(p) in WATCHED_EXTENSIONS for p in paths if p):
+                changed.set()
+
+    store = ResultStore()
+    state = IngestState(store.path)
+    observer = Observer()
+    observer.schedule(Handler(), folder, recursive=True)
+    observer.start()
+    try:
+        changed.set()  # initial catch-up scan
+        next_rescan = time.monotonic() + interval
+        while not stop_event.is_set():
+            if changed.wait(timeout=min(1.0, max(next_rescan - time.monotonic(), 0))):
+                # Wait for the burst of events to settle
+                changed.clear()
+                while changed.wait(timeout=settle) and not stop_event.is_set():
+                    changed.clear()
+            elif time.monotonic() < next_rescan:
+                continue
+            if stop_event.is_set():
+                break
+
+            summary = scan_once(folder, state, store, **options)
+            next_rescan = time.monotonic() + interval
+            if on_scan:
+                on_scan(summary)
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def _print_summary(summary):
+    counts, percentages = summary["aggregator"].distribution()
+    print(
+        f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {summary['files_ingested']} of {summary['files_seen']} files "
+        f"changed, {summary['lines_scored']} new lines scored"
+    )
+    for path, error in summary["errors"].items():
+        print(f"  Error in {path}: {error}")
+    print("  Running total: " + ", ".join(
+        f"{label.title()} {count} ({percentages.get(label, 0):.1f}%)" for label, count in counts.items()
+    ))
+
+
+def main(argv=None):
+    """Command line entry point: incrementally ingest a folder into the result store"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Watch a folder and ingest new TXT/PDF/DOCX/ZIP content")
+    parser.add_argument("folder", help="Folder to watch")
+    parser.add_argument("--once", action="store_true", help="Scan once and exit instead of watching")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help="Seconds of quiet before a change is ingested")
+    parser.add_argument("--interval", type=float, default=DEFAULT_RESCAN_INTERVAL,
+                        help="Seconds between full rescans")
+    parser.add_argument("--keyword-method", choices=["yake", "tfidf"], default="yake")
+    parser.add_argument("--escalation-threshold", type=float, help="Enable tiered scoring at this lexicon confidence")
+    args = parser.parse_args(argv)
+
+    options = {"keyword_method": args.keyword_method, "escalation_threshold": args.escalation_threshold}
+    if args.once:
+        _print_summary(scan_once(args.folder, **options))
+        return
+
+    print(f"Watching {os.path.abspath(args.folder)} (Ctrl+C to stop)")
+    try:
+        watch(args.folder, settle=args.settle, interval=args.interval, on_scan=_print_summary, **options)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()